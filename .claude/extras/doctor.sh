@@ -227,6 +227,9 @@ check_hooks() {
       continue
     fi
 
+    # Shared helper modules (_*.py) are imported by hooks, not run as hooks
+    [[ "$name" == _* ]] && continue
+
     # Check if it reads from stdin (required for hooks)
     if grep -q "sys.stdin\|json.load" "$hook" 2>/dev/null; then
       log_ok "$name: reads JSON from stdin"
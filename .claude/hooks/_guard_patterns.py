@@ -0,0 +1,57 @@
+"""
+Shared pattern-table helpers for the guard hooks (guard_bash.py, guard_browser.py).
+
+Not a hook itself: the guards import it after their cheap prefilters, so
+commands that exit early never pay for loading it.
+"""
+import re
+
+
+def union(patterns: list, named: bool = False) -> re.Pattern:
+    """
+    Compile patterns into one alternation so the input is scanned in a single
+    pass. With named=True each alternative is wrapped in group g<index>, so
+    `match.lastgroup` identifies which rule fired.
+
+    Patterns must be lowercase and are searched against `cmd.lower()`:
+    lowercasing once is cheaper than re.IGNORECASE, which case-folds every
+    comparison and disables the literal-prefix search.
+    """
+    if not patterns:
+        return re.compile(r"(?!x)x")  # matches nothing
+    if named:
+        alts = (f"(?P<g{i}>{p})" for i, p in enumerate(patterns))
+    else:
+        alts = (f"(?:{p})" for p in patterns)
+    return re.compile("|".join(alts))
+
+
+# first_then() pattern -> the plain `lead + rest` form it stands for
+_READABLE = {}
+
+
+def first_then(lead: str, rest: str) -> str:
+    """
+    Pattern for `lead` followed by `rest` that only tries the first `lead` on
+    each line. A plain `lead.*rest` re-runs `.*rest` from every repeat of
+    `lead`, which is quadratic on long lines; any match found from a later
+    `lead` is also found from the first one.
+    """
+    pattern = rf"(?<![^\n])(?:(?!{lead}).)*(?:{lead}){rest}"
+    _READABLE[pattern] = lead + rest
+    return pattern
+
+
+def scans_ahead(pattern: str) -> bool:
+    """Return True if `pattern` came from first_then(), the slowest kind of rule."""
+    return pattern in _READABLE
+
+
+def display(pattern: str) -> str:
+    """Return `pattern` as written in the rule table, for messages to the user."""
+    return _READABLE.get(pattern, pattern)
+
+
+def rule(rules: list, match: re.Match):
+    """Return the rules entry whose named group produced `match`."""
+    return rules[int(match.lastgroup[1:])]
@@ -0,0 +1,60 @@
+"""
+Shared helpers for the hooks that read and write .claude/logs or read the
+transcript (the log_*.py hooks, notify_linux.py, openclaw_cost_tracker.py,
+openclaw_memory_sync.py, ralph_loop_hook.py, tool_audit.py).
+
+Not a hook itself.
+"""
+import os
+import time
+
+
+def ensure_logs_dir(project_dir: str) -> str:
+    """
+    Return <project_dir>/.claude/logs, creating it on first use. Paths here are
+    plain strings: importing pathlib costs more than everything these hooks do.
+    """
+    logs_dir = os.path.join(project_dir, ".claude", "logs")
+    if not os.path.isdir(logs_dir):  # one stat in the common case
+        os.makedirs(logs_dir, exist_ok=True)
+    return logs_dir
+
+
+def utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp with microseconds, e.g. 2024-01-01T00:00:00.000000Z."""
+    secs, ns = divmod(time.time_ns(), 1_000_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(secs))}.{ns // 1000:06d}Z"
+
+
+def open_log(path: str) -> int:
+    """Open a log for appending; each os.write to the fd lands as one whole entry."""
+    return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def append_log(path: str, data: bytes) -> None:
+    """Append data with a single O_APPEND write, so concurrent hooks can't interleave entries."""
+    fd = open_log(path)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def reversed_lines(f, chunk_size: int = 64 * 1024):
+    """
+    Yield the lines of binary file `f` from last to first, reading backwards
+    from EOF so only the tail needed by the caller is read.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    pieces = []  # chunks of the line currently being assembled, last first
+    while pos > 0:
+        step = min(chunk_size, pos)
+        pos -= step
+        f.seek(pos)
+        parts = f.read(step).split(b"\n")
+        if len(parts) > 1:
+            yield parts.pop() + b"".join(reversed(pieces))
+            yield from reversed(parts[1:])
+            pieces = []
+        pieces.append(parts[0])
+    yield b"".join(reversed(pieces))
@@ -22,10 +22,13 @@ ROUTING_INSTRUCTION = """Cost-optimized execution policy (automatic routing, no
 4. Run build/test before completion; use browser verification only if UI changed.
 5. Never include Co-Authored-By lines in commit messages."""
 
+# Prompts starting with one of these (and containing "?") are plain questions
+QUESTION_STARTERS = ("what", "why", "how", "when", "where", "who", "can", "is", "are", "do", "does")
+
 
 def main() -> int:
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception:
         return 0
 
@@ -33,31 +36,18 @@ def main() -> int:
     if not prompt:
         return 0
 
-    # Skip injection for simple queries that don't need autopilot
-    skip_keywords = [
-        "what is",
-        "explain",
-        "how does",
-        "tell me about",
-        "describe",
-        "list",
-        "show me",
-        "help",
-        "?",
-    ]
-
     prompt_lower = prompt.lower().strip()
 
     # Skip for very short prompts or questions
     if len(prompt_lower) < 20:
         return 0
 
-    # Skip if it's just a question (starts with question word or ends with ?)
-    question_starters = ["what", "why", "how", "when", "where", "who", "can", "is", "are", "do", "does"]
-    if any(prompt_lower.startswith(q) for q in question_starters) and "?" in prompt:
+    # Skip if it's just a question (starts with question word and contains ?)
+    if prompt_lower.startswith(QUESTION_STARTERS) and "?" in prompt:
         return 0
 
-    # Skip if prompt already specifies routing/agents
+    # Skip if prompt already specifies routing/agents. Plain substring
+    # searches: several times faster than a regex alternation over the three.
     if "autopilot" in prompt_lower or "subagent" in prompt_lower or "plan first" in prompt_lower:
         return 0
 
@@ -10,6 +10,7 @@ Threshold: CLAUDE_CHECKPOINT_INTERVAL env var (default 10)
 """
 import json
 import os
+import re
 import sys
 from pathlib import Path
 
@@ -18,27 +19,49 @@ CHECKPOINT_STATE_FILE = ".claude/checkpoint-state.local.json"
 RALPH_STATE_FILE = ".claude/ralph-loop.local.md"
 DEFAULT_INTERVAL = 10
 
+# Bounded reads: the checkpoint only ever shows a prefix of these files
+CONTEXT_HEAD_BYTES = 4096  # key context is cut to 500 chars
+RALPH_HEAD_BYTES = 2048  # YAML frontmatter sits at the top
+MAX_COMPLETED = 5
+MAX_REMAINING = 10
 
-def _read_checkpoint_state(path: Path) -> dict:
-    """Read or initialize checkpoint state."""
-    if path.exists():
-        try:
-            return json.loads(path.read_text())
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {"round_count": 0}
+# "- [x] done" / "- [X] done" / "- [ ] todo", optionally indented
+_TASK_RE = re.compile(r"\s*- \[([xX ])\](.*)")
 
 
-def _write_checkpoint_state(path: Path, state: dict):
-    """Persist checkpoint state."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2))
+def _read_checkpoint_state(path: Path) -> tuple[dict, str]:
+    """Read or initialize checkpoint state. Also returns the raw file text."""
+    try:
+        text = path.read_text()
+    except OSError:
+        return {"round_count": 0}, ""
+    try:
+        return json.loads(text), text
+    except json.JSONDecodeError:
+        return {"round_count": 0}, text
+
+
+def _write_checkpoint_state(path: Path, state: dict, old_text: str = ""):
+    """Persist checkpoint state atomically, skipping the write if unchanged."""
+    text = f'{{"round_count": {int(state["round_count"])}}}\n'
+    if text == old_text:
+        return
+    # Write-then-rename so a concurrent Stop hook never reads a torn file
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(text)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(text)
+    os.replace(tmp, path)
 
 
-def _read_file_safe(path: Path) -> str:
-    """Read file contents or return empty string."""
+def _read_file_head(path: Path, n: int) -> str:
+    """Read at most n bytes of a file, or return empty string."""
     try:
-        return path.read_text() if path.exists() else ""
+        with open(path, "rb") as f:
+            # errors="ignore" drops a multi-byte char split at the cut
+            return f.read(n).decode("utf-8", errors="ignore")
     except OSError:
         return ""
 
@@ -60,51 +83,88 @@ def _parse_ralph_state(content: str) -> dict:
 def _find_context_dir(project_dir: Path) -> Path | None:
     """Find the most recent context task directory."""
     ctx_dir = project_dir / ".claude" / "context"
-    if not ctx_dir.is_dir():
-        return None
-    # Pick most recently modified subdirectory
-    subdirs = [d for d in ctx_dir.iterdir() if d.is_dir()]
-    if not subdirs:
+    # Pick most recently modified subdirectory. DirEntry.is_dir() uses the
+    # d_type from the directory listing, so only mtimes cost a stat().
+    best, best_mtime = None, -1.0
+    try:
+        with os.scandir(ctx_dir) as it:
+            for entry in it:
+                if entry.is_dir():
+                    mtime = entry.stat().st_mtime
+                    if mtime > best_mtime:
+                        best, best_mtime = entry.path, mtime
+    except OSError:
         return None
-    return max(subdirs, key=lambda d: d.stat().st_mtime)
+    return Path(best) if best else None
 
 
-def _extract_tasks(content: str) -> tuple[list[str], list[str]]:
-    """Extract checked and unchecked items from markdown task list."""
+def _extract_tasks(lines) -> tuple[list[str], list[str]]:
+    """
+    Extract checked and unchecked items from markdown task list lines.
+    Stops once enough of both have been collected for the checkpoint output.
+    """
     checked = []
     unchecked = []
-    for line in content.split("\n"):
-        stripped = line.strip()
-        if stripped.startswith("- [x]") or stripped.startswith("- [X]"):
-            checked.append(stripped[5:].strip())
-        elif stripped.startswith("- [ ]"):
-            unchecked.append(stripped[5:].strip())
+    for line in lines:
+        m = _TASK_RE.match(line)
+        if not m:
+            continue
+        if m.group(1) == " ":
+            if len(unchecked) < MAX_REMAINING:
+                unchecked.append(m.group(2).strip())
+        elif len(checked) < MAX_COMPLETED:
+            checked.append(m.group(2).strip())
+        if len(checked) >= MAX_COMPLETED and len(unchecked) >= MAX_REMAINING:
+            break
     return checked, unchecked
 
 
+def _read_goal(path: Path) -> str:
+    """Return the first non-empty line of plan.md, without its heading marks."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip().lstrip("#").strip()
+                if line:
+                    return line
+    except OSError:
+        pass
+    return ""
+
+
+def _read_tasks(path: Path) -> tuple[list[str], list[str]]:
+    """Stream tasks.md line by line, stopping early via _extract_tasks."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return _extract_tasks(f)
+    except OSError:
+        return [], []
+
+
 def main() -> int:
+    # The payload isn't needed; drain stdin without parsing it
     try:
-        payload = json.load(sys.stdin)
+        sys.stdin.buffer.read()
     except Exception:
-        payload = {}
+        pass
 
     project_dir = Path(os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd())
     interval = int(os.getenv("CLAUDE_CHECKPOINT_INTERVAL", str(DEFAULT_INTERVAL)))
 
     state_path = project_dir / CHECKPOINT_STATE_FILE
-    state = _read_checkpoint_state(state_path)
+    state, state_text = _read_checkpoint_state(state_path)
 
     # Increment round count
     state["round_count"] = state.get("round_count", 0) + 1
     count = state["round_count"]
 
     if count < interval:
-        _write_checkpoint_state(state_path, state)
+        _write_checkpoint_state(state_path, state, state_text)
         return 0
 
     # Threshold reached -- generate checkpoint output then reset
     state["round_count"] = 0
-    _write_checkpoint_state(state_path, state)
+    _write_checkpoint_state(state_path, state, state_text)
 
     # Gather context
     ctx_dir = _find_context_dir(project_dir)
@@ -114,22 +174,14 @@ def main() -> int:
     remaining = []
 
     if ctx_dir:
-        plan_content = _read_file_safe(ctx_dir / "plan.md")
-        context_content = _read_file_safe(ctx_dir / "context.md")
-        tasks_content = _read_file_safe(ctx_dir / "tasks.md")
-
-        # Extract goal from first non-empty line of plan
-        for line in plan_content.split("\n"):
-            line = line.strip().lstrip("#").strip()
-            if line:
-                goal = line
-                break
+        goal = _read_goal(ctx_dir / "plan.md")
+        context_content = _read_file_head(ctx_dir / "context.md", CONTEXT_HEAD_BYTES)
 
         key_context = context_content.strip()[:500] if context_content else ""
-        completed, remaining = _extract_tasks(tasks_content)
+        completed, remaining = _read_tasks(ctx_dir / "tasks.md")
 
     # Ralph loop state
-    ralph_content = _read_file_safe(project_dir / RALPH_STATE_FILE)
+    ralph_content = _read_file_head(project_dir / RALPH_STATE_FILE, RALPH_HEAD_BYTES)
     ralph_fm = _parse_ralph_state(ralph_content)
     ralph_info = ""
     if ralph_fm.get("active", "").lower() == "true":
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
-import json, os, subprocess, sys
+import json, os, sys
 
-data = json.load(sys.stdin)
+data = json.loads(sys.stdin.buffer.read())
 tool = data.get("tool_name", "")
 inp = data.get("tool_input", {}) or {}
 file_path = inp.get("file_path")  # present for Write/Edit-type tools in hooks
@@ -9,14 +9,45 @@ file_path = inp.get("file_path")  # present for Write/Edit-type tools in hooks
 if not file_path or not os.path.exists(file_path):
     sys.exit(0)
 
-def run(cmd):
-    return subprocess.call(cmd, shell=True)
+# Each file gets at most one formatter, chosen by extension, so two tools
+# never rewrite the same file at once: Python goes to black, everything
+# else to prettier
+BLACK_EXTS = {".py", ".pyi"}
+ext = os.path.splitext(file_path)[1].lower()
 
-# JS/TS: only if prettier config exists
+# One directory read instead of a stat() per candidate config file
 project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-if os.path.exists(os.path.join(project_dir, "package.json")) and any(os.path.exists(os.path.join(project_dir, p)) for p in [".prettierrc", ".prettierrc.json", ".prettierrc.yml", ".prettierrc.yaml"]):
-    run(f'npx -y prettier --write "{file_path}" 1>/dev/null 2>/dev/null || true')
+try:
+    with os.scandir(project_dir) as it:
+        names = {e.name for e in it}
+except OSError:
+    sys.exit(0)
+
+argv = None
 
 # Python: only if pyproject exists
-if os.path.exists(os.path.join(project_dir, "pyproject.toml")):
-    run(f'python3 -m black "{file_path}" 1>/dev/null 2>/dev/null || true')
+if ext in BLACK_EXTS:
+    if "pyproject.toml" in names:
+        argv = [sys.executable, "-m", "black", file_path]
+
+# Everything else: only if prettier config exists
+else:
+    if "package.json" in names and not names.isdisjoint({".prettierrc", ".prettierrc.json", ".prettierrc.yml", ".prettierrc.yaml"}):
+        # Prefer the project's own prettier; npx re-resolves the package every call
+        prettier = os.path.join(project_dir, "node_modules", ".bin", "prettier")
+        if "node_modules" in names and os.access(prettier, os.X_OK):
+            argv = [prettier, "--write", file_path]
+        else:
+            import shutil
+            npx = shutil.which("npx")
+            if npx:
+                argv = [npx, "-y", "prettier", "--write", file_path]
+
+if argv:
+    # An absolute argv[0] with close_fds=False lets subprocess use
+    # posix_spawn instead of fork/exec, and no shell is involved.
+    import subprocess  # deferred until a formatter actually runs
+    try:
+        subprocess.call(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=False)
+    except OSError:
+        pass
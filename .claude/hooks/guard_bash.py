@@ -7,14 +7,60 @@ Supply-chain security: blocks npx, curl|bash, and other remote code execution
 patterns that are common attack vectors in agent workflows.
 See: https://www.aikido.dev/blog/agent-skills-spreading-hallucinated-npx-commands
 """
-import json
 import os
-import re
 import sys
 
-data = json.load(sys.stdin)
+# -----------------------------------------------------------------------------
+# Prefilter: every blocking rule below contains at least one of these literals
+# (lowercased). Commands containing none of them cannot be blocked, so they
+# exit before any regex work. Keep this in sync when adding blocking rules.
+# -----------------------------------------------------------------------------
+PREFILTER_KEYWORDS = (
+    "rm", "del", "sudo", "doas", "curl", "wget", "ssh", "scp", "rsync",
+    "powershell", "cmd.exe", "mkfs", "of=/dev/", ":()", "base64",
+    "npx", "npm", "pip", "co-authored-by", "--author", "--amend", "push",
+)
+
+# A hook that times out (5s) lets the command through, so refuse anything too
+# long to check in time. The scan is linear: the worst adversarial payloads in
+# .claude/scripts/test_guard.py take ~0.6s at this size (~1.9s at 4x), which
+# leaves room for a slower machine.
+MAX_COMMAND_CHARS = 128 * 1024
+
+raw = sys.stdin.buffer.read()
+
+# Run the prefilter on the raw payload first: importing json (and re with it)
+# costs more than the rest of this hook. The keywords are printable ASCII, so
+# they appear verbatim in UTF-8 JSON unless escaped; payloads with \u or \/
+# escapes, or not starting with '{' (BOM, UTF-16), take the full parse.
+_raw_lower = raw.lower()
+if (
+    raw.lstrip()[:1] == b"{"
+    and b"\\u" not in raw
+    and b"\\/" not in raw
+    and not any(kw.encode() in _raw_lower for kw in PREFILTER_KEYWORDS)
+):
+    sys.exit(0)
+
+import json  # noqa: E402
+
+data = json.loads(raw)
 cmd = (data.get("tool_input", {}) or {}).get("command", "") or ""
 
+_cmd_lower = cmd.lower()
+if not any(kw in _cmd_lower for kw in PREFILTER_KEYWORDS):
+    sys.exit(0)
+
+if len(cmd) > MAX_COMMAND_CHARS:
+    print(
+        f"BLOCKED: command too long to check ({len(cmd)} > {MAX_COMMAND_CHARS} characters); "
+        "write it to a script file instead",
+        file=sys.stderr,
+    )
+    sys.exit(2)
+
+from _guard_patterns import display as _display, first_then, rule as _rule, scans_ahead as _scans_ahead, union as _union  # noqa: E402 -- deferred past the prefilter
+
 # Autonomous mode: activated by OPENCLAW_AUTONOMOUS=1 env var
 # Selectively promotes specific commands from blocked to allowed
 AUTONOMOUS_MODE = os.getenv("OPENCLAW_AUTONOMOUS", "0") == "1"
@@ -76,43 +122,33 @@ AUTONOMOUS_PROMOTED = [
 # Patterns blocked even in autonomous mode (commit policy enforcement)
 AUTONOMOUS_BLOCKED = [
     # NEVER allow Co-Authored-By in commit messages -- commits must appear as the user's own
-    (r"Co-Authored-By", "Co-Authored-By in commit (policy: commits must appear as user's own)"),
+    (r"co-authored-by", "Co-Authored-By in commit (policy: commits must appear as user's own)"),
     # No --author override
-    (r"git\s+commit\b.*--author", "--author flag (policy: commits must appear as user's own)"),
+    (first_then(r"git\s+commit\b", r".*--author"), "--author flag (policy: commits must appear as user's own)"),
     # No amend on main/master
-    (r"git\s+commit\b.*--amend", "--amend (policy: no amending in autonomous mode)"),
+    (first_then(r"git\s+commit\b", r".*--amend"), "--amend (policy: no amending in autonomous mode)"),
     # No push to main/master
-    (r"git\s+push\b.*\b(main|master)\b", "push to main/master (policy: feature branches only)"),
+    (first_then(r"git\s+push\b", r".*\b(main|master)\b"), "push to main/master (policy: feature branches only)"),
     # No force push
-    (r"git\s+push\b.*--force", "force push (policy: never force push)"),
+    (first_then(r"git\s+push\b", r".*--force"), "force push (policy: never force push)"),
 ]
 
 
 def is_always_allowed(cmd: str) -> bool:
-    """Check if command matches an always-allowed pattern."""
-    for pattern in ALWAYS_ALLOWED:
-        if re.search(pattern, cmd, re.IGNORECASE):
-            return True
-    return False
+    """Check if a lowercased command matches an always-allowed pattern."""
+    return _union(ALWAYS_ALLOWED).search(cmd) is not None
 
 
 def is_autonomous_promoted(cmd: str) -> bool:
-    """Check if command matches an autonomous promoted pattern."""
-    for pattern in AUTONOMOUS_PROMOTED:
-        if re.search(pattern, cmd, re.IGNORECASE):
-            return True
-    return False
+    """Check if a lowercased command matches an autonomous promoted pattern."""
+    return _union(AUTONOMOUS_PROMOTED).search(cmd) is not None
 
 
-def is_allowlisted(cmd: str, allowlist: list) -> bool:
-    """Check if command matches any allowlist pattern."""
-    for pattern in allowlist:
-        if re.search(pattern, cmd, re.IGNORECASE):
-            return True
-    return False
-
 # -----------------------------------------------------------------------------
 # Blocked patterns
+# New rules must contain a literal from PREFILTER_KEYWORDS (or extend it).
+# Patterns are matched against the lowercased command, so write them in
+# lowercase (escapes like \S and \W keep their meaning).
 # -----------------------------------------------------------------------------
 blocked = [
     # Destructive file operations
@@ -145,25 +181,29 @@ blocked = [
     (r"\bcmd\.exe\b", "cmd.exe"),
 
     # Destructive find commands
-    (r"\bfind\b.*\s-delete\b", "find -delete"),
-    (r"\bfind\b.*-exec\s+rm\b", "find -exec rm"),
-    (r"\bfind\b.*-execdir\s+rm\b", "find -execdir rm"),
-    (r"\bfind\b.*\|\s*xargs\s+rm\b", "find | xargs rm"),
+    (first_then(r"\bfind\b", r".*\s-delete\b"), "find -delete"),
+    (first_then(r"\bfind\b", r".*-exec\s+rm\b"), "find -exec rm"),
+    (first_then(r"\bfind\b", r".*-execdir\s+rm\b"), "find -execdir rm"),
+    (first_then(r"\bfind\b", r".*\|\s*xargs\s+rm\b"), "find | xargs rm"),
 
     # Additional dangerous patterns
     (r"\bmkfs\b", "mkfs"),
-    (r"\bdd\s+.*of=/dev/", "dd to device"),
+    (first_then(r"\bdd\s+", r".*of=/dev/"), "dd to device"),
     (r":\(\)\s*\{\s*:\s*\|\s*:\s*;\s*\}\s*;\s*:", "fork bomb"),
 
     # Remote code execution patterns (supply-chain attacks)
-    (r"\bcurl\b.*\|\s*(sh|bash|zsh|python|python3|perl|ruby)\b", "curl pipe to interpreter"),
-    (r"\bwget\b.*\|\s*(sh|bash|zsh|python|python3|perl|ruby)\b", "wget pipe to interpreter"),
-    (r"\bcurl\b.*>\s*[^|]+\s*&&\s*(sh|bash|chmod\s+\+x)", "curl download and execute"),
-    (r"\bwget\b.*&&\s*(sh|bash|chmod\s+\+x)", "wget download and execute"),
+    (first_then(r"\bcurl\b", r".*\|\s*(sh|bash|zsh|python|python3|perl|ruby)\b"), "curl pipe to interpreter"),
+    (first_then(r"\bwget\b", r".*\|\s*(sh|bash|zsh|python|python3|perl|ruby)\b"), "wget pipe to interpreter"),
+    # Only the first ">" of each pipe segment is tried: a later ">" in the same
+    # segment can't reach an "&&" that the first one can't. The "&&" must be
+    # on the same line: a tail that crossed newlines would rescan the rest of
+    # the input from every line, which is quadratic.
+    (first_then(r"\bcurl\b", r"(?:[^\n|]*\|)*[^\n|>]*>[^|\n]+&&\s*(sh|bash|chmod\s+\+x)"), "curl download and execute"),
+    (first_then(r"\bwget\b", r".*&&\s*(sh|bash|chmod\s+\+x)"), "wget download and execute"),
 
     # Base64 decoding to shell (obfuscation technique)
-    (r"base64\s+-d.*\|\s*(sh|bash)", "base64 decode to shell"),
-    (r"echo\s+.*\|\s*base64\s+-d\s*\|\s*(sh|bash)", "echo base64 to shell"),
+    (first_then(r"base64\s+-d", r".*\|\s*(sh|bash)"), "base64 decode to shell"),
+    (first_then(r"echo\s+", r".*\|\s*base64\s+-d\s*\|\s*(sh|bash)"), "echo base64 to shell"),
 ]
 
 # Supply-chain: npx commands (hallucinated package attacks)
@@ -184,42 +224,55 @@ blocked_supply_chain = [
     (r"^\s*pip3?\s+install\s+(?!-r\s+requirements)(?!-e\s+\.)(?!--upgrade\s+pip)", "pip install (unvetted)", ALLOWLISTED_PIP),
 ]
 
+# Policy violations blocked regardless of mode
+POLICY_BLOCKED = [
+    (r"co-authored-by", "Co-Authored-By in commit (policy: commits must appear as user's own)"),
+    (first_then(r"git\s+commit\b", r".*--author"), "--author flag (policy: commits must appear as user's own)"),
+]
+
 # Check autonomous mode policy violations first (always blocked regardless)
-for pattern, reason in [
-    (r"Co-Authored-By", "Co-Authored-By in commit (policy: commits must appear as user's own)"),
-    (r"git\s+commit\b.*--author", "--author flag (policy: commits must appear as user's own)"),
-]:
-    if re.search(pattern, cmd, re.IGNORECASE):
-        print(f"BLOCKED: {reason}", file=sys.stderr)
-        sys.exit(2)
+m = _union([p for p, _ in POLICY_BLOCKED], named=True).search(_cmd_lower)
+if m:
+    print(f"BLOCKED: {_rule(POLICY_BLOCKED, m)[1]}", file=sys.stderr)
+    sys.exit(2)
 
 if AUTONOMOUS_MODE:
-    for pattern, reason in AUTONOMOUS_BLOCKED:
-        if re.search(pattern, cmd, re.IGNORECASE):
-            print(f"BLOCKED: {reason}", file=sys.stderr)
-            sys.exit(2)
+    m = _union([p for p, _ in AUTONOMOUS_BLOCKED], named=True).search(_cmd_lower)
+    if m:
+        print(f"BLOCKED: {_rule(AUTONOMOUS_BLOCKED, m)[1]}", file=sys.stderr)
+        sys.exit(2)
 
 # Check always-allowed patterns first (bypass all other checks)
-if is_always_allowed(cmd):
+if is_always_allowed(_cmd_lower):
+    sys.exit(0)
+
+# In autonomous mode, promoted commands (git push to feature branches,
+# npm/pip install, ...) skip the blocked and supply-chain checks below
+if AUTONOMOUS_MODE and is_autonomous_promoted(_cmd_lower):
     sys.exit(0)
 
-# Check standard blocked patterns
-for pattern, name in blocked:
-    if re.search(pattern, cmd, re.IGNORECASE):
-        # In autonomous mode, check if this command is promoted
-        if AUTONOMOUS_MODE and is_autonomous_promoted(cmd):
-            continue
-        print(f"BLOCKED: '{name}' command not allowed. Pattern: {pattern}", file=sys.stderr)
+# Check standard blocked patterns. Plain rules go first so that a slow
+# first_then() rule can never delay a block that a cheap rule (rm -rf,
+# sudo, ...) would have found at once.
+for scans_ahead in (False, True):
+    rules = [r for r in blocked if _scans_ahead(r[0]) is scans_ahead]
+    m = _union([p for p, _ in rules], named=True).search(_cmd_lower)
+    if m:
+        pattern, name = _rule(rules, m)
+        print(f"BLOCKED: '{name}' command not allowed. Pattern: {_display(pattern)}", file=sys.stderr)
         sys.exit(2)
 
-# Check supply-chain patterns (with allowlist support)
-for pattern, name, allowlist in blocked_supply_chain:
-    if re.search(pattern, cmd, re.IGNORECASE):
-        if not is_allowlisted(cmd, allowlist):
-            # In autonomous mode, npm install and pip install are promoted
-            if AUTONOMOUS_MODE and is_autonomous_promoted(cmd):
-                continue
-            print(f"BLOCKED: '{name}' - add to allowlist in guard_bash.py if trusted", file=sys.stderr)
-            sys.exit(2)
+# Check supply-chain patterns (with allowlist support). Rules share one
+# alternation per allowlist, since the allowlist that can exempt a command
+# depends on which rule fired.
+for allowlist in (ALLOWLISTED_NPX, ALLOWLISTED_NPM, ALLOWLISTED_PIP):
+    rules = [r for r in blocked_supply_chain if r[2] is allowlist]
+    if not rules:
+        continue
+    m = _union([p for p, _, _ in rules], named=True).search(_cmd_lower)
+    if m and _union(allowlist).search(_cmd_lower) is None:
+        _, name, _ = _rule(rules, m)
+        print(f"BLOCKED: '{name}' - add to allowlist in guard_bash.py if trusted", file=sys.stderr)
+        sys.exit(2)
 
 sys.exit(0)
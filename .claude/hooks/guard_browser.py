@@ -9,7 +9,12 @@ import json
 import re
 import sys
 
-data = json.load(sys.stdin)
+# A hook that times out (5s) lets the command through, so refuse anything too
+# long to check in time. The worst repeated-"openclaw browser" payloads take
+# ~0.1s at this size; the cap matches guard_bash.py's.
+MAX_COMMAND_CHARS = 128 * 1024
+
+data = json.loads(sys.stdin.buffer.read())
 tool_name = data.get("tool_name", "")
 tool_input = data.get("tool_input", {}) or {}
 cmd = tool_input.get("command", "") or ""
@@ -18,12 +23,22 @@ cmd = tool_input.get("command", "") or ""
 if "openclaw browser" not in cmd and "openclaw browser" not in tool_name:
     sys.exit(0)
 
+if len(cmd) > MAX_COMMAND_CHARS:
+    print(
+        f"BLOCKED: command too long to check ({len(cmd)} > {MAX_COMMAND_CHARS} characters); "
+        "write it to a script file instead",
+        file=sys.stderr,
+    )
+    sys.exit(2)
+
+from _guard_patterns import display, first_then, rule, union  # noqa: E402
+
 # URLs that indicate payment/checkout/billing pages
 BLOCKED_URL_PATTERNS = [
     r"checkout",
     r"payment",
     r"billing",
-    r"pay\..*\.(com|net|org)",
+    first_then(r"pay\.", r".*\.(com|net|org)"),
     r"stripe\.com",
     r"paypal\.com",
     r"/cart/",
@@ -37,22 +52,29 @@ BLOCKED_URL_PATTERNS = [
 
 # Blocked browser actions on sensitive pages
 BLOCKED_ACTIONS = [
-    (r"openclaw\s+browser\s+type\b.*password", "typing passwords via CLI (use vault instead)"),
+    (first_then(r"openclaw\s+browser\s+type\b", r".*password"), "typing passwords via CLI (use vault instead)"),
     (r"openclaw\s+browser\s+submit\b", "form submission (use click on specific buttons instead)"),
 ]
 
+# One alternation per table; the named group g<index> identifies the rule
+_BLOCKED_URL_RE = union(BLOCKED_URL_PATTERNS, named=True)
+_BLOCKED_ACTION_RE = union([p for p, _ in BLOCKED_ACTIONS], named=True)
+
 # Check for blocked URLs in navigate commands
-if re.search(r"openclaw\s+browser\s+navigate\b", cmd, re.IGNORECASE):
-    for pattern in BLOCKED_URL_PATTERNS:
-        if re.search(pattern, cmd, re.IGNORECASE):
-            print(f"BLOCKED: Navigation to payment/checkout URL detected. Pattern: {pattern}", file=sys.stderr)
-            sys.exit(2)
+cmd_lc = cmd.lower()  # patterns are lowercase; match without IGNORECASE
 
-# Check for blocked actions
-for pattern, reason in BLOCKED_ACTIONS:
-    if re.search(pattern, cmd, re.IGNORECASE):
-        print(f"BLOCKED: {reason}", file=sys.stderr)
+if "navigate" in cmd_lc and re.search(r"openclaw\s+browser\s+navigate\b", cmd_lc):
+    m = _BLOCKED_URL_RE.search(cmd_lc)
+    if m:
+        pattern = rule(BLOCKED_URL_PATTERNS, m)
+        print(f"BLOCKED: Navigation to payment/checkout URL detected. Pattern: {display(pattern)}", file=sys.stderr)
         sys.exit(2)
 
+# Check for blocked actions
+m = _BLOCKED_ACTION_RE.search(cmd_lc)
+if m:
+    print(f"BLOCKED: {rule(BLOCKED_ACTIONS, m)[1]}", file=sys.stderr)
+    sys.exit(2)
+
 # Allow all other browser operations (snapshot, screenshot, cookie import/export, etc.)
 sys.exit(0)
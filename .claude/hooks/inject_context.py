@@ -11,7 +11,6 @@ Implements Just-in-Time context loading:
 import json
 import os
 import sys
-from pathlib import Path
 from typing import Optional
 
 
@@ -108,33 +107,42 @@ CONTINUATION_KEYWORDS = [
 def detect_context_needs(prompt: str) -> list:
     """Detect which context snippets to inject based on prompt keywords."""
     prompt_lower = prompt.lower()
-    snippets = []
+    snippets = {}  # dict as an ordered set: dedupes, keeps CONTEXT_TRIGGERS order
 
+    # One C-level substring search per keyword. A single regex alternation
+    # over the keywords measured several times slower than this for prompts
+    # of any size, before counting its compile cost.
     for keyword, context_lines in CONTEXT_TRIGGERS.items():
         if keyword in prompt_lower:
-            snippets.extend(context_lines)
+            snippets.update(dict.fromkeys(context_lines))
 
-    return list(set(snippets))  # Dedupe
+    return list(snippets)
 
 
 def detect_task_continuation(prompt: str) -> Optional[str]:
     """Check if user is continuing a previous task and find context."""
     prompt_lower = prompt.lower()
+    if not any(keyword in prompt_lower for keyword in CONTINUATION_KEYWORDS):
+        return None
 
-    for keyword in CONTINUATION_KEYWORDS:
-        if keyword in prompt_lower:
-            # Look for existing context directories
-            project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-            context_base = Path(project_dir) / ".claude" / "context"
+    # Look for existing context directories
+    project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
+    context_base = os.path.join(project_dir, ".claude", "context")
 
-            if context_base.exists():
-                # Find most recently modified context directory
-                contexts = list(context_base.iterdir())
-                if contexts:
-                    latest = max(contexts, key=lambda p: p.stat().st_mtime)
-                    return str(latest)
+    # Find most recently modified context directory in one scandir pass.
+    # Not cached on the parent's mtime: that only changes when entries are
+    # added or removed, not when a task directory's own mtime moves.
+    latest, latest_mtime = None, -1.0
+    try:
+        with os.scandir(context_base) as it:
+            for entry in it:
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest, latest_mtime = entry.path, mtime
+    except OSError:
+        return None
 
-    return None
+    return latest
 
 
 def build_injection(prompt: str) -> Optional[str]:
@@ -145,29 +153,27 @@ def build_injection(prompt: str) -> Optional[str]:
     if not snippets and not continuation_dir:
         return None
 
-    injection_parts = []
-
     # Add context snippets
+    injection = ""
     if snippets:
-        injection_parts.append("**Relevant Context:**")
-        for snippet in snippets[:5]:  # Limit to 5 snippets
-            injection_parts.append(f"- {snippet}")
+        del snippets[5:]  # Limit to 5 snippets
+        injection = "**Relevant Context:**\n- " + "\n- ".join(snippets)
 
-    # Add task continuation info
+    # Add task continuation info, after a blank line
     if continuation_dir:
-        injection_parts.append("")
-        injection_parts.append(f"**Previous session state found at:** `{continuation_dir}`")
-        injection_parts.append("Read plan.md, context.md, and tasks.md to resume.")
-
-    if injection_parts:
-        return "\n".join(injection_parts)
+        if injection:
+            injection += "\n"
+        injection += (
+            f"\n**Previous session state found at:** `{continuation_dir}`\n"
+            "Read plan.md, context.md, and tasks.md to resume."
+        )
 
-    return None
+    return injection
 
 
 def main() -> int:
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception:
         return 0  # No input, nothing to inject
 
@@ -2,10 +2,11 @@
 import json
 import os
 import sys
-import datetime
-from pathlib import Path
+
+from _log_common import append_log, ensure_logs_dir, reversed_lines, utc_timestamp
 
 MAX_CHARS = 20000  # keep logs readable; adjust if you want
+TAIL_CHUNK_BYTES = 64 * 1024  # transcript is read backwards in chunks of this size
 
 def _extract_text(obj) -> str:
     """
@@ -17,19 +18,20 @@ def _extract_text(obj) -> str:
     # - { type: "assistant", content: [...] }
     # - { message: { role: "assistant", content: [...] } }
     candidate = obj
+    if not isinstance(candidate, dict):
+        return ""
 
-    if isinstance(obj, dict) and "message" in obj and isinstance(obj["message"], dict):
-        candidate = obj["message"]
-
-    role = candidate.get("role") if isinstance(candidate, dict) else None
-    typ = candidate.get("type") if isinstance(candidate, dict) else None
+    message = candidate.get("message")
+    if isinstance(message, dict):
+        candidate = message
+    get = candidate.get
 
-    if role != "assistant" and typ not in ("assistant", "assistant_message"):
+    if get("role") != "assistant" and get("type") not in ("assistant", "assistant_message"):
         # Not clearly assistant; might still contain assistant content in some schemas,
         # and we avoid mislabeling.
         return ""
 
-    content = candidate.get("content") if isinstance(candidate, dict) else None
+    content = get("content")
 
     # content as string
     if isinstance(content, str):
@@ -40,8 +42,9 @@ def _extract_text(obj) -> str:
         parts = []
         for item in content:
             if isinstance(item, dict):
-                if "text" in item and isinstance(item["text"], str):
-                    parts.append(item["text"])
+                text = item.get("text")
+                if isinstance(text, str):
+                    parts.append(text)
                 elif item.get("type") == "text" and isinstance(item.get("content"), str):
                     parts.append(item["content"])
         text = "".join(parts).strip()
@@ -50,9 +53,11 @@ def _extract_text(obj) -> str:
 
     # fallback: sometimes it's under different keys
     for k in ("text", "output", "response"):
-        v = candidate.get(k) if isinstance(candidate, dict) else None
-        if isinstance(v, str) and v.strip():
-            return v.strip()
+        v = get(k)
+        if isinstance(v, str):
+            v = v.strip()
+            if v:
+                return v
 
     # last resort
     try:
@@ -61,7 +66,7 @@ def _extract_text(obj) -> str:
         return ""
 
 def main():
-    hook_input = json.load(sys.stdin)
+    hook_input = json.loads(sys.stdin.buffer.read())
 
     transcript_path = hook_input.get("transcript_path")
     session_id = hook_input.get("session_id", "unknown")
@@ -71,16 +76,15 @@ def main():
         sys.exit(0)
 
     transcript_path = os.path.expanduser(transcript_path)
-    p = Path(transcript_path)
 
-    if not p.exists():
+    if not os.path.exists(transcript_path):
         sys.exit(0)
 
-    # Read jsonl and find the last assistant message
+    # Read jsonl from the end and stop at the last assistant message
     last_text = ""
     try:
-        with p.open("r", encoding="utf-8") as f:
-            for line in f:
+        with open(transcript_path, "rb") as f:
+            for line in reversed_lines(f, TAIL_CHUNK_BYTES):
                 line = line.strip()
                 if not line:
                     continue
@@ -92,6 +96,7 @@ def main():
                 text = _extract_text(obj)
                 if text:
                     last_text = text
+                    break
     except Exception:
         sys.exit(0)
 
@@ -102,15 +107,10 @@ def main():
         last_text = last_text[:MAX_CHARS] + "\n...[truncated]..."
 
     project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-    logs_dir = Path(project_dir) / ".claude" / "logs"
-    os.makedirs(logs_dir, exist_ok=True)
-    out_path = logs_dir / "assistant_output.log"
-
-    ts = datetime.datetime.utcnow().isoformat() + "Z"
-    with out_path.open("a", encoding="utf-8") as f:
-        f.write(f"{ts} | session={session_id} | event={event}\n")
-        f.write(last_text)
-        f.write("\n\n---\n\n")
+    logs_dir = ensure_logs_dir(project_dir)
+
+    entry = f"{utc_timestamp()} | session={session_id} | event={event}\n{last_text}\n\n---\n\n"
+    append_log(os.path.join(logs_dir, "assistant_output.log"), entry.encode("utf-8"))
 
 if __name__ == "__main__":
     main()
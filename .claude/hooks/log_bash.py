@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
-import json, sys, datetime, os
+import json, sys, os
 
-data = json.load(sys.stdin)
-cmd = data.get("tool_input", {}).get("command", "")
-desc = data.get("tool_input", {}).get("description", "")
+from _log_common import append_log, ensure_logs_dir, utc_timestamp
+
+data = json.loads(sys.stdin.buffer.read())
+tool_input = data.get("tool_input", {}) or {}
+cmd = tool_input.get("command", "")
+desc = tool_input.get("description", "")
 
 project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-logs_dir = os.path.join(project_dir, ".claude", "logs")
-os.makedirs(logs_dir, exist_ok=True)
-with open(os.path.join(logs_dir, "bash.log"), "a", encoding="utf-8") as f:
-    f.write(f"{datetime.datetime.utcnow().isoformat()}Z | {cmd} | {desc}\n")
+logs_dir = ensure_logs_dir(project_dir)
+append_log(os.path.join(logs_dir, "bash.log"), f"{utc_timestamp()} | {cmd} | {desc}\n".encode("utf-8"))
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
-import json, sys, os, datetime
+import json, sys, os
 
-data = json.load(sys.stdin)
+from _log_common import append_log, ensure_logs_dir, utc_timestamp
+
+data = json.loads(sys.stdin.buffer.read())
 prompt = data.get("user_prompt", "") or data.get("prompt", "")
 
 project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-logs_dir = os.path.join(project_dir, ".claude", "logs")
-os.makedirs(logs_dir, exist_ok=True)
-with open(os.path.join(logs_dir, "prompts.log"), "a", encoding="utf-8") as f:
-    f.write(f"{datetime.datetime.utcnow().isoformat()}Z\n{prompt}\n---\n")
+logs_dir = ensure_logs_dir(project_dir)
+append_log(os.path.join(logs_dir, "prompts.log"), f"{utc_timestamp()}\n{prompt}\n---\n".encode("utf-8"))
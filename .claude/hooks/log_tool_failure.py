@@ -2,38 +2,41 @@
 import json
 import os
 import sys
-from datetime import datetime
-from pathlib import Path
 
-
-def ensure_logs_dir(project_dir: str) -> Path:
-    logs_dir = Path(project_dir) / ".claude" / "logs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    return logs_dir
+from _log_common import append_log, ensure_logs_dir, utc_timestamp
 
 
 def main() -> int:
     project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
     logs_dir = ensure_logs_dir(project_dir)
 
+    raw = sys.stdin.buffer.read().strip()
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(raw)
     except Exception as e:
-        with (logs_dir / "tool_failures.log").open("a", encoding="utf-8") as f:
-            f.write(f"{datetime.utcnow().isoformat()}Z invalid JSON: {e}\n")
+        append_log(os.path.join(logs_dir, "tool_failures.log"), f"{utc_timestamp()} invalid JSON: {e}\n".encode("utf-8"))
         return 0
 
     record = {
-        "ts": datetime.utcnow().isoformat() + "Z",
+        "ts": utc_timestamp(),
         "hook_event_name": payload.get("hook_event_name", "PostToolUseFailure"),
         "tool_name": payload.get("tool_name"),
         "cwd": payload.get("cwd"),
         "permission_mode": payload.get("permission_mode"),
-        "payload": payload,  # keep full raw payload for deterministic triage
     }
 
-    with (logs_dir / "tool_failures.jsonl").open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    # Keep the full raw payload for deterministic triage. It is spliced in as
+    # received rather than re-serialized: the input already is valid JSON, and
+    # any raw newline in it is whitespace between tokens (never inside a
+    # string), so flattening those keeps one record per line.
+    line = json.dumps(record, ensure_ascii=False).encode("utf-8")
+    if raw[:1] == b"{":
+        line = line[:-1] + b', "payload": ' + raw.replace(b"\r", b" ").replace(b"\n", b" ") + b"}"
+    else:  # BOM or UTF-16 input: re-encode as UTF-8 JSON
+        record["payload"] = payload
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8")
+
+    append_log(os.path.join(logs_dir, "tool_failures.jsonl"), line + b"\n")
 
     return 0
 
@@ -24,34 +24,54 @@ Note: Desktop notifications (notify-send) are disabled by default.
 
 Set CLAUDE_NOTIFY_DISABLE=1 to disable all notifications.
 """
+import functools
 import json
 import os
-import platform
-import shutil
-import subprocess
 import sys
-import urllib.request
-import urllib.error
-from datetime import datetime
-from pathlib import Path
+import time
+
+from _log_common import ensure_logs_dir, open_log, utc_timestamp
+
+# The Notification hook is killed after 3s (settings.local.json). Backends are
+# started one after another, but a backend that hasn't answered within
+# HEDGE_DELAY_SECS gets the next one started alongside it, so a hung server
+# can't use up the whole budget before the fallbacks run.
+NOTIFY_DEADLINE_SECS = 2.5
+HEDGE_DELAY_SECS = 1.0
+
+# The send_* functions import urllib.request themselves: it is by far the
+# slowest import here, and most Notification events are filtered out before
+# anything is sent.
+
+# ntfy topics are ASCII letters, digits, "-" and "_": map everything else to "-"
+_TOPIC_TRANS = str.maketrans({chr(c): "-" for c in range(128) if not (chr(c).isalnum() or chr(c) == "-")})
 
 
 def get_default_ntfy_topic() -> str:
     """Generate a default ntfy topic based on hostname."""
+    import platform
+
     hostname = platform.node() or "unknown"
-    # Sanitize hostname for use as ntfy topic (alphanumeric and hyphens only)
-    sanitized = "".join(c if c.isalnum() or c == "-" else "-" for c in hostname.lower())
+    # Sanitize hostname for use as ntfy topic (alphanumeric and hyphens only).
+    # Non-ASCII characters become "?" via the ascii codec, then "-".
+    sanitized = hostname.lower().encode("ascii", "replace").decode("ascii").translate(_TOPIC_TRANS)
     return f"claude-code-{sanitized}"
 
 
-def ensure_logs_dir(project_dir: str) -> Path:
-    logs_dir = Path(project_dir) / ".claude" / "logs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    return logs_dir
+def open_notifications_log(project_dir: str) -> int:
+    """Open .claude/logs/notifications.log for appending and return the fd."""
+    return open_log(os.path.join(ensure_logs_dir(project_dir), "notifications.log"))
+
 
+def log_line(log_fd: int, message: str):
+    """Append a timestamped line to notifications.log (fd from open_notifications_log)."""
+    os.write(log_fd, f"{utc_timestamp()} {message}\n".encode("utf-8"))
 
-def send_ntfy(topic: str, title: str, body: str, logs_dir: Path = None) -> bool:
+
+def send_ntfy(topic: str, title: str, body: str, log_fd: int = None) -> bool:
     """Send notification via ntfy.sh"""
+    import urllib.request
+
     try:
         url = f"https://ntfy.sh/{topic}"
         data = body.encode("utf-8")
@@ -68,14 +88,16 @@ def send_ntfy(topic: str, title: str, body: str, logs_dir: Path = None) -> bool:
         with urllib.request.urlopen(req, timeout=5) as resp:
             return resp.status == 200
     except Exception as e:
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z ntfy error: {e}\n")
+        if log_fd is not None:
+            log_line(log_fd, f"ntfy error: {e}")
         return False
 
 
-def send_pushover(user: str, token: str, title: str, body: str, logs_dir: Path = None) -> bool:
+def send_pushover(user: str, token: str, title: str, body: str, log_fd: int = None) -> bool:
     """Send notification via Pushover"""
+    import urllib.parse
+    import urllib.request
+
     try:
         data = urllib.parse.urlencode({
             "token": token,
@@ -92,14 +114,15 @@ def send_pushover(user: str, token: str, title: str, body: str, logs_dir: Path =
         with urllib.request.urlopen(req, timeout=5) as resp:
             return resp.status == 200
     except Exception as e:
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z pushover error: {e}\n")
+        if log_fd is not None:
+            log_line(log_fd, f"pushover error: {e}")
         return False
 
 
-def send_discord(webhook_url: str, title: str, body: str, logs_dir: Path = None) -> bool:
+def send_discord(webhook_url: str, title: str, body: str, log_fd: int = None) -> bool:
     """Send notification via Discord webhook"""
+    import urllib.request
+
     try:
         payload = json.dumps({
             "embeds": [{
@@ -117,14 +140,15 @@ def send_discord(webhook_url: str, title: str, body: str, logs_dir: Path = None)
         with urllib.request.urlopen(req, timeout=5) as resp:
             return resp.status in (200, 204)
     except Exception as e:
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z discord error: {e}\n")
+        if log_fd is not None:
+            log_line(log_fd, f"discord error: {e}")
         return False
 
 
-def send_slack(webhook_url: str, title: str, body: str, logs_dir: Path = None) -> bool:
+def send_slack(webhook_url: str, title: str, body: str, log_fd: int = None) -> bool:
     """Send notification via Slack webhook"""
+    import urllib.request
+
     try:
         payload = json.dumps({
             "text": f"*{title}*\n{body}",
@@ -138,9 +162,8 @@ def send_slack(webhook_url: str, title: str, body: str, logs_dir: Path = None) -
         with urllib.request.urlopen(req, timeout=5) as resp:
             return resp.status == 200
     except Exception as e:
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z slack error: {e}\n")
+        if log_fd is not None:
+            log_line(log_fd, f"slack error: {e}")
         return False
 
 
@@ -168,59 +191,159 @@ def send_terminal_bell() -> bool:
         return False
 
 
-def send_notify_send(title: str, body: str, logs_dir: Path = None) -> bool:
+def send_notify_send(title: str, body: str, log_fd: int = None) -> bool:
     """Send notification via Linux notify-send"""
     # Check if display is available (X11 or Wayland)
     if not is_display_available():
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z notify-send: skipped (no DISPLAY/WAYLAND_DISPLAY - headless environment)\n")
+        if log_fd is not None:
+            log_line(log_fd, "notify-send: skipped (no DISPLAY/WAYLAND_DISPLAY - headless environment)")
         # Try terminal bell as fallback
         send_terminal_bell()
         return False
 
+    # Deferred: only the opt-in desktop backend needs process spawning
+    import shutil
+    import subprocess
+
     notify_send = shutil.which("notify-send")
     if not notify_send:
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z notify-send: not found\n")
+        if log_fd is not None:
+            log_line(log_fd, "notify-send: not found")
         return False
     try:
         result = subprocess.run(
             [notify_send, title, body],
             check=False,
+            close_fds=False,  # with an absolute path, lets subprocess use posix_spawn
             capture_output=True,
             text=True,
         )
         if result.returncode != 0:
-            if logs_dir:
-                with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                    f.write(f"{datetime.utcnow().isoformat()}Z notify-send failed: {result.stderr.strip()}\n")
+            if log_fd is not None:
+                log_line(log_fd, f"notify-send failed: {result.stderr.strip()}")
             return False
         return True
     except Exception as e:
-        if logs_dir:
-            with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()}Z notify-send error: {e}\n")
+        if log_fd is not None:
+            log_line(log_fd, f"notify-send error: {e}")
         return False
 
 
+def configured_backends() -> list:
+    """
+    Return (name, send) pairs for the configured backends, in order of
+    preference. Each send is called as send(title, body, log_fd) -> bool.
+    """
+    backends = []
+
+    # 1. ntfy.sh (DEFAULT - always used)
+    # Check env var first, then config file, then use default based on hostname
+    ntfy_topic = os.getenv("CLAUDE_NTFY_TOPIC")
+    if not ntfy_topic:
+        ntfy_config = os.path.expanduser("~/.config/claude-code/ntfy_topic")
+        try:  # one failed open when the file is absent, no separate stat
+            with open(ntfy_config) as f:
+                ntfy_topic = f.read().strip()
+        except OSError:
+            pass
+    if not ntfy_topic:
+        # Use hostname-based default topic
+        ntfy_topic = get_default_ntfy_topic()
+
+    backends.append(("ntfy", functools.partial(send_ntfy, ntfy_topic)))
+
+    # 2. Pushover
+    pushover_user = os.getenv("CLAUDE_PUSHOVER_USER")
+    pushover_token = os.getenv("CLAUDE_PUSHOVER_TOKEN")
+    if pushover_user and pushover_token:
+        backends.append(("pushover", functools.partial(send_pushover, pushover_user, pushover_token)))
+
+    # 3. Discord webhook
+    discord_webhook = os.getenv("CLAUDE_DISCORD_WEBHOOK")
+    if discord_webhook:
+        backends.append(("discord", functools.partial(send_discord, discord_webhook)))
+
+    # 4. Slack webhook
+    slack_webhook = os.getenv("CLAUDE_SLACK_WEBHOOK")
+    if slack_webhook:
+        backends.append(("slack", functools.partial(send_slack, slack_webhook)))
+
+    # 5. Linux desktop (opt-in only - disabled by default)
+    enable_desktop = os.getenv("CLAUDE_NOTIFY_DESKTOP", "").lower() in ("1", "true")
+    if enable_desktop:
+        backends.append(("notify-send", send_notify_send))
+
+    return backends
+
+
+def dispatch(backends: list) -> tuple[bool, list]:
+    """
+    Run (name, send) backends in order of preference until one returns True.
+
+    Each send runs in a daemon thread. The next backend starts as soon as the
+    latest one fails, or when HEDGE_DELAY_SECS pass without an answer.
+    Returns whether any backend succeeded before NOTIFY_DEADLINE_SECS, and the
+    names of the backends that were started.
+    """
+    import queue
+    import threading
+
+    results = queue.Queue()
+    deadline = time.monotonic() + NOTIFY_DEADLINE_SECS
+    tried = []
+    pending = 0
+
+    def run(i, send):
+        try:
+            results.put((i, bool(send())))
+        except Exception:
+            results.put((i, False))
+
+    for i, (name, send) in enumerate(backends):
+        tried.append(name)
+        threading.Thread(target=run, args=(i, send), daemon=True).start()
+        pending += 1
+        last = i == len(backends) - 1
+        # After the last backend, wait out the deadline instead of the hedge delay
+        wait_until = deadline if last else min(deadline, time.monotonic() + HEDGE_DELAY_SECS)
+        while pending:
+            try:
+                done, ok = results.get(timeout=max(0.0, wait_until - time.monotonic()))
+            except queue.Empty:
+                break  # still waiting on a slow backend: start the next one too
+            pending -= 1
+            if ok:
+                return True, tried
+            if done == i and not last:
+                break  # latest backend failed: move on without waiting for older ones
+        if time.monotonic() >= deadline:
+            break
+
+    return False, tried
+
+
 def main() -> int:
     # Disable all notifications if requested
     if os.getenv("CLAUDE_NOTIFY_DISABLE", "").lower() in ("1", "true"):
         return 0
 
     project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-    logs_dir = ensure_logs_dir(project_dir)
 
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception as e:
-        with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-            f.write(f"{datetime.utcnow().isoformat()}Z notify: invalid JSON: {e}\n")
+        log_line(open_notifications_log(project_dir), f"notify: invalid JSON: {e}")
         return 0
 
     notif_type = payload.get("notification_type", "")
+    # Only notify for important events; settle this before touching any files
+    if notif_type not in ("permission_prompt", "idle_prompt"):
+        return 0
+
+    # One fd for every line this run logs. It is left open until exit because
+    # hedged backends may still be logging from their threads.
+    log_fd = open_notifications_log(project_dir)
+
     message = payload.get("message", "")
     cwd = payload.get("cwd", "")
 
@@ -230,31 +353,31 @@ def main() -> int:
 
     # Try to get memorable terminal name from terminal identity hook
     terminal_name = ""
-    identity_path = Path(project_dir) / ".claude" / "terminal-identity.local.json"
-    if identity_path.exists():
-        try:
-            identity_data = json.loads(identity_path.read_text(encoding="utf-8"))
-            terminal_name = identity_data.get("name", "")
-        except Exception:
-            pass
+    identity_path = os.path.join(project_dir, ".claude", "terminal-identity.local.json")
+    try:
+        with open(identity_path, "rb") as f:
+            identity_data = json.loads(f.read())
+        terminal_name = identity_data.get("name", "")
+    except Exception:
+        pass  # missing or unreadable identity file
 
     # Try to get task name from ralph loop state
     task_label = ""
-    ralph_state = Path(project_dir) / ".claude" / "ralph-loop.local.md"
-    if ralph_state.exists():
-        try:
-            content = ralph_state.read_text()
-            # Extract first non-frontmatter line as task label
+    ralph_state = os.path.join(project_dir, ".claude", "ralph-loop.local.md")
+    try:
+        # Extract first non-frontmatter line as task label, reading no further
+        with open(ralph_state, "r", encoding="utf-8") as f:
             in_frontmatter = False
-            for line in content.splitlines():
-                if line.strip() == "---":
+            for line in f:
+                line = line.strip()
+                if line == "---":
                     in_frontmatter = not in_frontmatter
                     continue
-                if not in_frontmatter and line.strip():
-                    task_label = line.strip()[:60]
+                if not in_frontmatter and line:
+                    task_label = line[:60]
                     break
-        except Exception:
-            pass
+    except Exception:
+        pass  # no active ralph loop
 
     # Prefer terminal_name over short_session for the tag
     terminal_tag = ""
@@ -265,13 +388,10 @@ def main() -> int:
     if task_label:
         terminal_tag = f" [{terminal_name or short_session}] {task_label[:40]}"
 
-    # Only notify for important events
     if notif_type == "permission_prompt":
         title = f"Claude Code: Permission required{terminal_tag}"
-    elif notif_type == "idle_prompt":
+    else:  # idle_prompt
         title = f"Claude Code: Waiting for input{terminal_tag}"
-    else:
-        return 0
 
     body = message.strip()
     if cwd:
@@ -288,65 +408,25 @@ def main() -> int:
         body = f"Session: {short_session}\n{body}"
 
     # Log regardless of notification success
-    with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-        f.write(f"{datetime.utcnow().isoformat()}Z [{notif_type}] {body}\n")
+    log_line(log_fd, f"[{notif_type}] {body}")
 
-    # Try notification backends in order of preference
-    sent = False
-    backends_tried = []
-
-    # 1. ntfy.sh (DEFAULT - always used)
-    # Check env var first, then config file, then use default based on hostname
-    ntfy_topic = os.getenv("CLAUDE_NTFY_TOPIC")
-    if not ntfy_topic:
-        ntfy_config = Path.home() / ".config" / "claude-code" / "ntfy_topic"
-        if ntfy_config.exists():
-            ntfy_topic = ntfy_config.read_text().strip()
-    if not ntfy_topic:
-        # Use hostname-based default topic
-        ntfy_topic = get_default_ntfy_topic()
-
-    backends_tried.append("ntfy")
-    sent = send_ntfy(ntfy_topic, title, body, logs_dir)
-
-    # 2. Pushover
-    pushover_user = os.getenv("CLAUDE_PUSHOVER_USER")
-    pushover_token = os.getenv("CLAUDE_PUSHOVER_TOKEN")
-    if pushover_user and pushover_token and not sent:
-        backends_tried.append("pushover")
-        sent = send_pushover(pushover_user, pushover_token, title, body, logs_dir)
-
-    # 3. Discord webhook
-    discord_webhook = os.getenv("CLAUDE_DISCORD_WEBHOOK")
-    if discord_webhook and not sent:
-        backends_tried.append("discord")
-        sent = send_discord(discord_webhook, title, body, logs_dir)
-
-    # 4. Slack webhook
-    slack_webhook = os.getenv("CLAUDE_SLACK_WEBHOOK")
-    if slack_webhook and not sent:
-        backends_tried.append("slack")
-        sent = send_slack(slack_webhook, title, body, logs_dir)
-
-    # 5. Linux desktop (opt-in only - disabled by default)
-    enable_desktop = os.getenv("CLAUDE_NOTIFY_DESKTOP", "").lower() in ("1", "true")
-    if enable_desktop and not sent:
-        backends_tried.append("notify-send")
-        sent = send_notify_send(title, body, logs_dir)
+    # Backend config is only read now, once the event is known to be sent
+    backends = [
+        (name, functools.partial(send, title, body, log_fd))
+        for name, send in configured_backends()
+    ]
+    sent, backends_tried = dispatch(backends)
 
     # Log warning if no notification was sent
     if not sent:
-        with (logs_dir / "notifications.log").open("a", encoding="utf-8") as f:
-            if not backends_tried:
-                f.write(f"{datetime.utcnow().isoformat()}Z WARNING: No notification backend configured. "
-                        "Set CLAUDE_NTFY_TOPIC or run: bash .claude/bootstrap/linux_devtools.sh\n")
-            else:
-                f.write(f"{datetime.utcnow().isoformat()}Z WARNING: Notification failed via: {', '.join(backends_tried)}\n")
+        if not backends_tried:
+            log_line(log_fd, "WARNING: No notification backend configured. "
+                     "Set CLAUDE_NTFY_TOPIC or run: bash .claude/bootstrap/linux_devtools.sh")
+        else:
+            log_line(log_fd, f"WARNING: Notification failed via: {', '.join(backends_tried)}")
 
     return 0
 
 
 if __name__ == "__main__":
-    # Import urllib.parse here to avoid issues if not needed
-    import urllib.parse
     raise SystemExit(main())
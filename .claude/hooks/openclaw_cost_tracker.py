@@ -7,15 +7,21 @@ then appends it to .claude/logs/cost-tracker.log.
 
 Auto-detects OpenClaw via shutil.which() — graceful no-op if not found.
 """
+import fcntl
 import json
 import os
 import shutil
 import subprocess
 import sys
-from datetime import datetime, timezone
+import time
 from pathlib import Path
+from typing import Optional
+
+from _log_common import reversed_lines
 
 LOG_FILE = ".claude/logs/cost-tracker.log"
+# Running total for the current UTC day, so the log isn't rescanned each session
+DAILY_FILE = ".claude/logs/cost-tracker.daily.json"
 
 # Alert thresholds (informational on Claude Max)
 SESSION_ALERT = float(os.getenv("CLAUDE_COST_ALERT_THRESHOLD", "5.00"))
@@ -24,31 +30,43 @@ DAILY_ALERT = float(os.getenv("CLAUDE_COST_DAILY_ALERT", "20.00"))
 
 def main() -> int:
     # Auto-detect OpenClaw
-    if not shutil.which("openclaw"):
+    # Resolved once: the subprocess calls below exec this path directly
+    openclaw = shutil.which("openclaw")
+    if not openclaw:
         return 0  # No-op: OpenClaw not installed
 
     project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
     session_id = os.getenv("CLAUDE_SESSION_ID", "unknown")
 
+    # Query OpenClaw for usage stats. Started before the stdin read so the
+    # CLI's startup overlaps it; stdin=DEVNULL keeps it off our payload.
+    try:
+        proc = subprocess.Popen(
+            [openclaw, "status", "--usage", "--json"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return 0  # Skip on any error
+
     # Read stdin payload (may have session metadata)
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception:
         payload = {}
 
-    # Query OpenClaw for usage stats
     try:
-        result = subprocess.run(
-            ["openclaw", "status", "--usage", "--json"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        if result.returncode != 0:
+        stdout, _ = proc.communicate(timeout=10)
+        if proc.returncode != 0:
             return 0  # OpenClaw command failed, skip silently
 
-        usage = json.loads(result.stdout)
-    except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
+        usage = json.loads(stdout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        return 0
+    except json.JSONDecodeError:
         return 0  # Skip on any error
 
     # Extract token data
@@ -58,71 +76,113 @@ def main() -> int:
     estimated_cost = usage.get("estimated_cost", 0.0)
 
     # Format log entry
-    ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     log_entry = (
         f"[{ts}] session={session_id[:12]} "
         f"in={input_tokens} out={output_tokens} "
         f"cache={cache_read_tokens} cost=${estimated_cost:.4f}"
     )
 
-    # Write to log
+    # Write to log, then update today's total before releasing the lock.
+    # Stop and SubagentStop runs (and other terminals on this project) can
+    # overlap; without the lock one run's read-add-replace of the daily file
+    # would drop the other's cost, and a rebuild from the log could count an
+    # entry whose run hasn't added it yet.
+    daily_alert = None
     try:
         log_path = Path(project_dir) / LOG_FILE
         log_path.parent.mkdir(parents=True, exist_ok=True)
         with open(log_path, "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when f is closed
             f.write(log_entry + "\n")
+            f.flush()
+            daily_alert = _check_daily_total(project_dir, estimated_cost)
     except Exception:
         pass  # Don't fail the session for logging errors
 
     # Check alert thresholds (informational)
+    alerts = []
     if estimated_cost > SESSION_ALERT:
-        _send_alert(
+        alerts.append(
             f"Session cost alert: ${estimated_cost:.2f} "
-            f"(threshold: ${SESSION_ALERT:.2f})",
-            project_dir,
+            f"(threshold: ${SESSION_ALERT:.2f})"
         )
 
     # Check daily total
-    _check_daily_total(project_dir)
+    if daily_alert:
+        alerts.append(daily_alert)
+
+    # One `openclaw notify` process for however many thresholds tripped
+    if alerts:
+        _send_alert(openclaw, "\n".join(alerts))
 
     return 0
 
 
-def _check_daily_total(project_dir: str):
-    """Check if daily cost exceeds threshold."""
+def _check_daily_total(project_dir: str, session_cost: float) -> Optional[str]:
+    """
+    Update today's total and return an alert message if it exceeds the
+    threshold. The caller holds the cost log's lock.
+    """
     try:
-        log_path = Path(project_dir) / LOG_FILE
-        if not log_path.exists():
-            return
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        daily_path = Path(project_dir) / DAILY_FILE
+
+        try:
+            with open(daily_path, "rb") as f:
+                daily_total = json.loads(f.read())[today] + session_cost
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, corrupt or from an earlier day: rebuild from the log,
+            # which already contains this session's entry
+            daily_total = _scan_daily_total(project_dir, today)
+
+        tmp_path = daily_path.with_name(f"{daily_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({today: daily_total}))
+        os.replace(tmp_path, daily_path)
+
+        if daily_total > DAILY_ALERT:
+            return (
+                f"Daily cost alert: ${daily_total:.2f} "
+                f"(threshold: ${DAILY_ALERT:.2f})"
+            )
+    except Exception:
+        pass
+    return None
 
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        daily_total = 0.0
 
-        with open(log_path, "r", encoding="utf-8") as f:
-            for line in f:
-                if today in line and "cost=$" in line:
-                    # Extract cost value
-                    cost_part = line.split("cost=$")[-1].strip()
+def _scan_daily_total(project_dir: str, today: str) -> float:
+    """
+    Sum today's costs from the log. Entries are appended in time order, so
+    the log is read backwards and the scan stops at the first earlier day.
+    """
+    log_path = Path(project_dir) / LOG_FILE
+    prefix = f"[{today}".encode("ascii")
+    daily_total = 0.0
+    try:
+        with open(log_path, "rb") as f:
+            for line in reversed_lines(f):
+                if not line:
+                    continue
+                if not line.startswith(prefix):
+                    break
+                # Extract cost value
+                _, sep, cost_part = line.rpartition(b"cost=$")
+                if sep:
                     try:
                         daily_total += float(cost_part)
                     except ValueError:
                         continue
-
-        if daily_total > DAILY_ALERT:
-            _send_alert(
-                f"Daily cost alert: ${daily_total:.2f} "
-                f"(threshold: ${DAILY_ALERT:.2f})",
-                project_dir,
-            )
-    except Exception:
+    except FileNotFoundError:
         pass
+    return daily_total
 
 
-def _send_alert(message: str, project_dir: str):
+def _send_alert(openclaw: str, message: str):
     """Send alert via OpenClaw notification (Discord etc)."""
     try:
         subprocess.run(
-            ["openclaw", "notify", message],
+            [openclaw, "notify", message],
             capture_output=True,
             text=True,
             timeout=5,
@@ -11,9 +11,10 @@ import json
 import os
 import shutil
 import sys
-from datetime import datetime, timezone
 from pathlib import Path
 
+from _log_common import reversed_lines, utc_timestamp
+
 
 def main() -> int:
     # Auto-detect OpenClaw
@@ -29,7 +30,7 @@ def main() -> int:
 
     # Read stdin payload
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception:
         payload = {}
 
@@ -49,15 +50,13 @@ def main() -> int:
     except Exception:
         return 0  # Can't create directory, skip
 
-    # Sync three-file pattern
+    # Sync three-file pattern. copy2 already copies with sendfile on Linux;
+    # a missing file just fails the open, so there's no separate exists() stat.
     for filename in ("plan.md", "context.md", "tasks.md"):
-        src = context_dir / filename
-        dst = memory_dir / filename
-        if src.exists():
-            try:
-                shutil.copy2(str(src), str(dst))
-            except Exception:
-                continue
+        try:
+            shutil.copy2(context_dir / filename, memory_dir / filename)
+        except Exception:
+            continue
 
     # Sync latest tool-audit.log entry
     _sync_audit_entry(project_dir, memory_dir)
@@ -65,14 +64,15 @@ def main() -> int:
     # Write sync metadata
     try:
         meta = {
-            "synced_at": datetime.now(timezone.utc).isoformat(),
+            "synced_at": utc_timestamp(),
             "session_id": session_id,
             "task_name": task_name,
             "project_dir": project_dir,
         }
         meta_path = memory_dir / "sync-metadata.json"
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(meta, f, indent=2)
+        # Encoded once and written in one call; compact, as it's only read by tools
+        with open(meta_path, "wb") as f:
+            f.write(json.dumps(meta, separators=(",", ":")).encode("utf-8"))
     except Exception:
         pass
 
@@ -83,23 +83,29 @@ def _sync_audit_entry(project_dir: str, memory_dir: Path):
     """Copy the latest tool-audit.log entry to memory for searchable audit trail."""
     try:
         audit_log = Path(project_dir) / ".claude" / "logs" / "tool-audit.log"
-        if not audit_log.exists():
-            return
 
-        # Read last entry (entries are separated by blank lines)
-        content = audit_log.read_text(encoding="utf-8")
-        entries = content.strip().split("\n\n")
-        if not entries:
+        # Read last entry (entries are separated by blank lines), walking back
+        # from EOF so the rest of the log is never read
+        lines = []
+        with open(audit_log, "rb") as f:
+            for line in reversed_lines(f):
+                if not lines and not line.strip():
+                    continue  # trailing blank lines
+                if not line:
+                    break
+                lines.append(line)
+        if not lines:
             return
 
-        last_entry = entries[-1].strip()
+        # Copied as bytes: the entry is never inspected, so no decode/encode
+        last_entry = b"\n".join(reversed(lines)).strip()
         if not last_entry:
             return
 
         # Append to memory audit trail
         audit_dest = memory_dir / "audit-trail.log"
-        with open(audit_dest, "a", encoding="utf-8") as f:
-            f.write(last_entry + "\n\n")
+        with open(audit_dest, "ab") as f:
+            f.write(last_entry + b"\n\n")
     except Exception:
         pass
 
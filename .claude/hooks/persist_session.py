@@ -32,10 +32,11 @@ def get_context_dir() -> Path:
 def ensure_three_files(context_dir: Path) -> dict:
     """Ensure all three pattern files exist with templates."""
     files = {}
+    present = set(os.listdir(context_dir))  # one directory read, not a stat per file
 
     # plan.md template
     plan_file = context_dir / "plan.md"
-    if not plan_file.exists():
+    if "plan.md" not in present:
         plan_file.write_text("""# Plan
 
 ## Goal
@@ -57,7 +58,7 @@ def ensure_three_files(context_dir: Path) -> dict:
 
     # context.md template
     context_file = context_dir / "context.md"
-    if not context_file.exists():
+    if "context.md" not in present:
         context_file.write_text("""# Context
 
 ## Key Learnings
@@ -79,7 +80,7 @@ def ensure_three_files(context_dir: Path) -> dict:
 
     # tasks.md template
     tasks_file = context_dir / "tasks.md"
-    if not tasks_file.exists():
+    if "tasks.md" not in present:
         tasks_file.write_text("""# Tasks
 
 ## Current
@@ -120,17 +121,17 @@ def _sync_to_openclaw(context_dir: Path, task_name: str):
         memory_dir.mkdir(parents=True, exist_ok=True)
 
         for filename in ("plan.md", "context.md", "tasks.md"):
-            src = context_dir / filename
-            dst = memory_dir / filename
-            if src.exists():
-                _shutil.copy2(str(src), str(dst))
+            try:
+                _shutil.copy2(context_dir / filename, memory_dir / filename)
+            except FileNotFoundError:
+                continue
     except Exception:
         pass  # Best-effort sync
 
 
 def main() -> int:
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception:
         # No input or invalid JSON - just ensure files exist
         payload = {}
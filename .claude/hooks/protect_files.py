@@ -13,7 +13,7 @@ import json
 import os
 import re
 import sys
-from pathlib import Path, PurePosixPath
+from pathlib import Path
 
 from typing import List, Optional, Tuple
 
@@ -23,11 +23,16 @@ ALLOW_OVERRIDE_ENV = "CLAUDE_ALLOW_PROTECTED_EDITS"
 
 # Sentinel markers in code that indicate protected sections
 # These must appear in code comments to be recognized
+#
+# The patterns are joined into one regex and searched in the file's raw UTF-8
+# bytes, so: letters match case-insensitively for ASCII only, non-ASCII text
+# must match exactly as written, and \w, \b, \s and \d are ASCII classes.
 SENTINEL_MARKER_PATTERNS = [
     r"LEGACY_PROTECTED\b",
     r"DO_NOT_MODIFY\b",
     r"SECURITY_CRITICAL\b",
 ]
+_SENTINEL_MARKER_RE = re.compile("|".join(SENTINEL_MARKER_PATTERNS).encode("utf-8"), re.IGNORECASE)
 
 # File extensions that support sentinel marker detection
 # Only check code files, not documentation or config
@@ -37,6 +42,10 @@ CODE_EXTENSIONS = {
     ".sh", ".bash", ".zsh", ".fish",
 }
 
+# Glob patterns below match the whole project-relative path. `**/` matches any
+# number of directories (including none), a trailing `/**` matches everything
+# below, and `*`/`?` stay within one path component.
+
 # Allowlist: these patterns are safe to edit even if they match protected globs
 ALLOWED_PATTERNS = [
     "**/.env.example",
@@ -86,20 +95,22 @@ PROTECTED_GLOBS = [
 ]
 
 
-def to_project_relative(path_str: str, project_dir: str) -> str:
+def to_project_relative(path_str: str, project_root: Optional[Path]) -> str:
     """
     Convert an absolute path to project-relative (POSIX style) if possible.
     Keep as-is (normalized) if not under project dir.
+
+    `project_root` is resolved once by the caller (None if that failed). The
+    path itself is still resolved so a symlink to a protected file is caught.
     """
     p = Path(path_str)
-    proj = Path(project_dir)
 
     try:
-        rp = p.resolve()
-        rproj = proj.resolve()
-        if str(rp).startswith(str(rproj) + os.sep) or rp == rproj:
-            rel = rp.relative_to(rproj).as_posix()
-            return rel
+        if project_root is not None:
+            rp = p.resolve()
+            if str(rp).startswith(str(project_root) + os.sep) or rp == project_root:
+                rel = rp.relative_to(project_root).as_posix()
+                return rel
     except Exception:
         pass
 
@@ -107,24 +118,77 @@ def to_project_relative(path_str: str, project_dir: str) -> str:
     return p.as_posix().lstrip("./")
 
 
+def _glob_to_regex(pattern: str) -> str:
+    """Translate one glob (see the note above ALLOWED_PATTERNS) to a regex."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        else:
+            c = pattern[i]
+            i += 1
+            if c == "*":
+                out.append("[^/]*")
+            elif c == "?":
+                out.append("[^/]")
+            elif c == "[" and "]" in pattern[i + 1:]:
+                j = pattern.index("]", i + 1)
+                chars = pattern[i:j].replace("\\", "\\\\")
+                if chars.startswith("!"):
+                    chars = "^/" + chars[1:]
+                out.append(f"[{chars}]")
+                i = j + 1
+            else:
+                out.append(re.escape(c))
+    return "".join(out)
+
+
+def _compile_globs(patterns: List[str]) -> re.Pattern:
+    """Compile patterns into one alternation, matched with fullmatch."""
+    return re.compile("|".join(f"(?:{_glob_to_regex(p)})" for p in patterns))
+
+
+def _required_literal(pattern: str) -> str:
+    """Longest wildcard-free run of a glob: every path the glob matches contains it."""
+    return max(re.split(r"\*\*/|[*?]|\[.[^\]]*\]", pattern), key=len)
+
+
+def _compile_hint(patterns: List[str]) -> re.Pattern:
+    """
+    Compile a literal scan that finds something in any path that might match
+    one of the patterns. A miss settles the common case with one fast search.
+    """
+    literals = dict.fromkeys(_required_literal(p) for p in patterns)
+    # A literal that contains another is redundant ("secrets" vs "secret")
+    literals = [lit for lit in literals if not any(o != lit and o in lit for o in literals)]
+    return re.compile("|".join(map(re.escape, literals)))
+
+
+# Compiled once per run, so each path is checked with a single regex match
+# per list instead of parsing every glob again
+_ALLOWED_RE = _compile_globs(ALLOWED_PATTERNS)
+_PROTECTED_RE = _compile_globs(PROTECTED_GLOBS)
+_PROTECTED_HINT_RE = _compile_hint(PROTECTED_GLOBS)
+
+
 def is_allowed(rel_posix: str) -> bool:
     """Check if file matches an allowed pattern (takes precedence over protected)."""
-    rel = PurePosixPath(rel_posix)
-    for pat in ALLOWED_PATTERNS:
-        if rel.match(pat):
-            return True
-    return False
+    return _ALLOWED_RE.fullmatch(rel_posix) is not None
 
 
 def is_protected(rel_posix: str) -> bool:
+    # Most paths contain none of the globs' literals and can't match any of them
+    if not _PROTECTED_HINT_RE.search(rel_posix):
+        return False
     # Allowlist takes precedence
     if is_allowed(rel_posix):
         return False
-    rel = PurePosixPath(rel_posix)
-    for pat in PROTECTED_GLOBS:
-        if rel.match(pat):
-            return True
-    return False
+    return _PROTECTED_RE.fullmatch(rel_posix) is not None
 
 
 def is_code_file(file_path: str) -> bool:
@@ -144,14 +208,13 @@ def has_sentinel_marker(file_path: str) -> Tuple[bool, Optional[str]]:
         return False, None
 
     try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        with open(file_path, "rb") as f:
             content = f.read(50000)  # Only check first 50KB
 
-            # Look for markers that indicate truly protected code
-            for marker_pattern in SENTINEL_MARKER_PATTERNS:
-                match = re.search(marker_pattern, content, re.IGNORECASE)
-                if match:
-                    return True, match.group(0)
+        # Look for markers that indicate truly protected code
+        match = _SENTINEL_MARKER_RE.search(content)
+        if match:
+            return True, match.group(0).decode("utf-8", errors="ignore")
     except (OSError, IOError):
         pass  # File doesn't exist yet or can't be read
     return False, None
@@ -175,14 +238,8 @@ def extract_paths(tool_name: str, tool_input: dict) -> List[str]:
                 if isinstance(p, str) and p.strip():
                     paths.append(p.strip())
 
-    # Dedup
-    out: List[str] = []
-    seen: set[str] = set()
-    for p in paths:
-        if p not in seen:
-            out.append(p)
-            seen.add(p)
-    return out
+    # Dedup, keeping first-seen order
+    return list(dict.fromkeys(paths))
 
 
 def main() -> int:
@@ -192,7 +249,7 @@ def main() -> int:
     project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
 
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception as e:
         print(f"protect_files: invalid JSON input: {e}", file=sys.stderr)
         return 0  # don't break the session
@@ -207,8 +264,12 @@ def main() -> int:
         return 0
 
     paths = extract_paths(tool_name, tool_input)
+    try:
+        project_root = Path(project_dir).resolve()
+    except Exception:
+        project_root = None
     for p in paths:
-        rel = to_project_relative(p, project_dir)
+        rel = to_project_relative(p, project_root)
 
         # Check glob-based protection
         if is_protected(rel):
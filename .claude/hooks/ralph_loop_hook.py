@@ -36,6 +36,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from _log_common import reversed_lines, utc_timestamp
+
 # State file location
 STATE_FILE = ".claude/ralph-loop.local.md"
 LOG_FILE = ".claude/logs/ralph-loop.log"
@@ -56,6 +58,9 @@ def _log(project_dir: str, message: str):
         pass
 
 
+_BOOLS = {"true": True, "false": False}
+
+
 def parse_state_file(content: str) -> tuple[dict, str]:
     """
     Parse YAML frontmatter and body from state file.
@@ -68,26 +73,23 @@ def parse_state_file(content: str) -> tuple[dict, str]:
     if content.startswith("---"):
         parts = content.split("---", 2)
         if len(parts) >= 3:
-            yaml_content = parts[1].strip()
             body = parts[2].strip()
 
-            # Simple YAML parsing (key: value pairs)
-            for line in yaml_content.split("\n"):
-                line = line.strip()
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
+            # Simple YAML parsing (key: value pairs). partition() splits on
+            # the first colon in one call; lines without one are skipped.
+            for line in parts[1].split("\n"):
+                key, colon, value = line.partition(":")
+                if not colon:
+                    continue
+                value = value.strip().strip('"').strip("'")
 
-                    # Type conversion
-                    if value.lower() == "true":
-                        value = True
-                    elif value.lower() == "false":
-                        value = False
-                    elif value.isdigit():
-                        value = int(value)
+                # Type conversion
+                if value.isdigit():
+                    value = int(value)
+                else:
+                    value = _BOOLS.get(value.lower(), value)
 
-                    frontmatter[key] = value
+                frontmatter[key.strip()] = value
 
     return frontmatter, body
 
@@ -111,17 +113,16 @@ def write_state_file(path: Path, frontmatter: dict, body: str):
 
 def extract_last_assistant_text(transcript_path: str) -> str:
     """Extract the last assistant message from the JSONL transcript."""
-    last_text = ""
-
     try:
-        with open(transcript_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
+        # Walk back from EOF: the last assistant message is near the end, so
+        # the rest of the transcript is never read or parsed
+        with open(transcript_path, "rb") as f:
+            for line in reversed_lines(f):
+                if not line.strip():
                     continue
                 try:
                     obj = json.loads(line)
-                except json.JSONDecodeError:
+                except ValueError:
                     continue
 
                 # Handle various transcript formats
@@ -141,22 +142,23 @@ def extract_last_assistant_text(transcript_path: str) -> str:
                 content = candidate.get("content", "")
 
                 if isinstance(content, str):
-                    last_text = content
+                    return content
                 elif isinstance(content, list):
-                    parts = []
-                    for item in content:
-                        if isinstance(item, dict):
-                            if "text" in item:
-                                parts.append(item["text"])
-                            elif item.get("type") == "text" and "content" in item:
-                                parts.append(item["content"])
+                    # A block's "text", or the "content" of a text-typed
+                    # block without one
+                    parts = [
+                        item["text"] if "text" in item else item["content"]
+                        for item in content
+                        if isinstance(item, dict)
+                        and ("text" in item or (item.get("type") == "text" and "content" in item))
+                    ]
                     if parts:
-                        last_text = "".join(parts)
+                        return "".join(parts)
 
     except Exception:
         pass
 
-    return last_text
+    return ""
 
 
 def check_completion_promise(text: str, promise: str) -> bool:
@@ -164,19 +166,26 @@ def check_completion_promise(text: str, promise: str) -> bool:
     Check if the text contains the completion promise.
     Looks for <promise>TEXT</promise> tags.
     """
-    # Check for promise tags
-    promise_pattern = r"<promise>(.*?)</promise>"
-    matches = re.findall(promise_pattern, text, re.IGNORECASE | re.DOTALL)
-
-    for match in matches:
-        if match.strip().upper() == promise.upper():
-            return True
-
-    # Also check for bare promise text as fallback
-    if promise.upper() in text.upper():
-        return True
-
-    return False
+    # A substring test covers the tags: a <promise> tag whose stripped content
+    # equals the promise contains it, so the bare-text check already accepts
+    # it. Scanning the tags first with a regex could never change the result.
+    return promise.upper() in text.upper()
+
+
+# Whole-response idle replies, as one alternation so is_idle_response makes a
+# single match call
+_IDLE_RE = re.compile(
+    r"^(?:"
+    r"\.*"  # Just dots
+    r"|standing by\.?"
+    r"|ready\.?"
+    r"|ready when you are\.?"
+    r"|awaiting.*input\.?"
+    r"|listening\.?"
+    r"|waiting\.?"
+    r")$",
+    re.IGNORECASE,
+)
 
 
 def is_idle_response(text: str) -> bool:
@@ -187,19 +196,8 @@ def is_idle_response(text: str) -> bool:
     text = text.strip()
 
     # Very short responses (under 50 chars) that are just waiting
-    idle_patterns = [
-        r"^\.*$",  # Just dots
-        r"^standing by\.?$",
-        r"^ready\.?$",
-        r"^ready when you are\.?$",
-        r"^awaiting.*input\.?$",
-        r"^listening\.?$",
-        r"^waiting\.?$",
-    ]
-
-    for pattern in idle_patterns:
-        if re.match(pattern, text, re.IGNORECASE):
-            return True
+    if _IDLE_RE.match(text):
+        return True
 
     # Very short responses (under 20 chars) are likely idle
     if len(text) < 20 and not text.startswith("<"):
@@ -211,7 +209,7 @@ def is_idle_response(text: str) -> bool:
 def main() -> int:
     # Read hook input
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(sys.stdin.buffer.read())
     except Exception:
         payload = {}
 
@@ -250,7 +248,7 @@ def main() -> int:
                 _log(project_dir, f"Stale loop detected ({age_hours:.1f}h old). Deactivating.")
                 print(f"Ralph loop stale ({age_hours:.1f}h old). Deactivating.", file=sys.stderr)
                 frontmatter["active"] = False
-                frontmatter["ended_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+                frontmatter["ended_at"] = utc_timestamp()
                 frontmatter["end_reason"] = "stale_timeout"
                 write_state_file(state_path, frontmatter, body)
                 return 0
@@ -261,7 +259,7 @@ def main() -> int:
     if iteration >= max_iterations:
         print(f"Ralph loop reached max iterations ({max_iterations}). Deactivating.", file=sys.stderr)
         frontmatter["active"] = False
-        frontmatter["ended_at"] = datetime.utcnow().isoformat() + "Z"
+        frontmatter["ended_at"] = utc_timestamp()
         frontmatter["end_reason"] = "max_iterations"
         write_state_file(state_path, frontmatter, body)
         return 0  # Allow exit
@@ -280,7 +278,7 @@ def main() -> int:
             _log(project_dir, f"Promise '{completion_promise}' fulfilled. Loop complete.")
             print(f"Ralph loop completed: Promise '{completion_promise}' fulfilled.", file=sys.stderr)
             frontmatter["active"] = False
-            frontmatter["ended_at"] = datetime.utcnow().isoformat() + "Z"
+            frontmatter["ended_at"] = utc_timestamp()
             frontmatter["end_reason"] = "promise_fulfilled"
             write_state_file(state_path, frontmatter, body)
             return 0  # Allow exit
@@ -293,7 +291,7 @@ def main() -> int:
             if consecutive_idle >= max_idle:
                 print(f"Ralph loop detected idle agent ({consecutive_idle} consecutive). Auto-exiting.", file=sys.stderr)
                 frontmatter["active"] = False
-                frontmatter["ended_at"] = datetime.utcnow().isoformat() + "Z"
+                frontmatter["ended_at"] = utc_timestamp()
                 frontmatter["end_reason"] = "idle_detected"
                 write_state_file(state_path, frontmatter, body)
                 return 0  # Allow exit
@@ -304,7 +302,7 @@ def main() -> int:
     # Loop continues - increment iteration and block exit
     _log(project_dir, f"Incrementing iteration to {iteration + 1}/{max_iterations}. Blocking exit.")
     frontmatter["iteration"] = iteration + 1
-    frontmatter["last_run_at"] = datetime.utcnow().isoformat() + "Z"
+    frontmatter["last_run_at"] = utc_timestamp()
     write_state_file(state_path, frontmatter, body)
 
     # Output the prompt to continue the loop
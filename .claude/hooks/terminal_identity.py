@@ -5,15 +5,15 @@ UserPromptSubmit hook that assigns a random memorable name to each terminal sess
 Generates a two-word name (adjective-animal) on first prompt, stores it in
 .claude/terminal-identity.local.json. Prints a small tag on EVERY prompt
 so the user can always see which terminal they're in without scrolling.
+
+The name is also cached in .claude/terminal-identity.local.name, which later
+prompts read without importing json. The cache is ignored once it is older
+than the JSON file, so edits to the JSON file still take effect.
 """
-import json
 import os
-import random
 import sys
-from datetime import datetime
-from pathlib import Path
 
-ADJECTIVES = [
+ADJECTIVES = (
     "cosmic", "thunder", "velvet", "neon", "shadow", "crystal", "phantom",
     "golden", "iron", "arctic", "blazing", "crimson", "mystic", "quantum",
     "swift", "silent", "brave", "clever", "fierce", "noble", "lunar",
@@ -22,9 +22,9 @@ ADJECTIVES = [
     "turbo", "rapid", "primal", "vivid", "bold", "keen", "wild",
     "stormy", "dusty", "pixel", "cyber", "stealth", "sonic", "atomic",
     "radiant",
-]
+)
 
-ANIMALS = [
+ANIMALS = (
     "penguin", "falcon", "panther", "wolf", "dragon", "phoenix", "tiger",
     "cobra", "raven", "hawk", "fox", "bear", "shark", "eagle", "lynx",
     "otter", "viper", "mustang", "jaguar", "puma", "dolphin", "mantis",
@@ -32,39 +32,76 @@ ANIMALS = [
     "koala", "lemur", "moose", "narwhal", "osprey", "parrot", "quail",
     "raptor", "salmon", "toucan", "urchin", "walrus", "yak", "zebra",
     "coyote", "ferret", "gorilla", "hyena", "iguana", "jackal", "octopus",
-]
+)
 
 
-def main() -> int:
-    project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
-    identity_path = Path(project_dir) / ".claude" / "terminal-identity.local.json"
+def _read_name_sidecar(identity_path: str, name_path: str):
+    """Return the name from the sidecar, or None if it is missing or stale."""
+    try:
+        if os.stat(name_path).st_mtime_ns < os.stat(identity_path).st_mtime_ns:
+            return None
+        with open(name_path, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+def _write_name_sidecar(name_path: str, name: str):
+    """Cache the name for later prompts; a failed write only costs speed."""
+    try:
+        with open(name_path, "w", encoding="utf-8") as f:
+            f.write(f"{name}\n")
+    except OSError:
+        pass
+
+
+def _load_or_create_name(identity_path: str) -> str:
+    """Read the name from the identity file, creating the file if needed."""
+    import json
 
     name = None
 
     # Try to read existing identity
-    if identity_path.exists():
-        try:
-            data = json.loads(identity_path.read_text(encoding="utf-8"))
-            name = data.get("name")
-        except (json.JSONDecodeError, OSError):
-            pass
+    try:
+        with open(identity_path, encoding="utf-8") as f:
+            data = json.loads(f.read())
+        name = data.get("name")
+    except (json.JSONDecodeError, OSError):
+        pass
 
     # Generate new name if none exists
     if not name:
+        import random
+
+        from _log_common import utc_timestamp
+
         name = f"{random.choice(ADJECTIVES)}-{random.choice(ANIMALS)}"
-        identity_path.parent.mkdir(parents=True, exist_ok=True)
-        identity_path.write_text(
-            json.dumps(
-                {
-                    "session_id": os.getenv("CLAUDE_SESSION_ID", ""),
-                    "name": name,
-                    "created_at": datetime.utcnow().isoformat() + "Z",
-                },
-                indent=2,
+        os.makedirs(os.path.dirname(identity_path), exist_ok=True)
+        with open(identity_path, "w", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "session_id": os.getenv("CLAUDE_SESSION_ID", ""),
+                        "name": name,
+                        "created_at": utc_timestamp(),
+                    },
+                    indent=2,
+                )
+                + "\n"
             )
-            + "\n",
-            encoding="utf-8",
-        )
+
+    return name
+
+
+def main() -> int:
+    project_dir = os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd()
+    identity_path = os.path.join(project_dir, ".claude", "terminal-identity.local.json")
+    name_path = identity_path[: -len(".json")] + ".name"
+
+    name = _read_name_sidecar(identity_path, name_path)
+    if not name:
+        name = _load_or_create_name(identity_path)
+        _write_name_sidecar(name_path, name)
 
     # Print tag on EVERY prompt so user always knows which terminal this is
     sys.stderr.write(f"[{name}]\n")
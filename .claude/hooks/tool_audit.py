@@ -5,12 +5,14 @@ Tool audit Stop hook.
 Parses the most recent transcript JSONL to extract tool usage from the latest
 assistant turn, then appends a summary to .claude/logs/tool-audit.log.
 """
+import functools
 import json
 import os
 import sys
+import time
 from collections import Counter
-from datetime import datetime, timezone
-from pathlib import Path
+
+from _log_common import append_log, ensure_logs_dir, reversed_lines
 
 LOG_FILE = ".claude/logs/tool-audit.log"
 
@@ -18,11 +20,9 @@ LOG_FILE = ".claude/logs/tool-audit.log"
 def _log_error(project_dir: str, message: str):
     """Log an error to the audit log."""
     try:
-        log_path = Path(project_dir) / LOG_FILE
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(f"[{ts}] ERROR: {message}\n")
+        ensure_logs_dir(project_dir)
+        ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        append_log(os.path.join(project_dir, LOG_FILE), f"[{ts}] ERROR: {message}\n".encode("utf-8"))
     except Exception:
         pass
 
@@ -32,47 +32,44 @@ def extract_latest_turn_tool_blocks(transcript_path: str) -> list[dict]:
     Read JSONL transcript and return tool_use/tool_result blocks from the
     last assistant turn.
     """
-    # Collect all lines, then walk backwards to find the last assistant turn
-    entries = []
-    with open(transcript_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+    # Walk backwards from EOF to find the last assistant message with tool_use
+    # content. We want all consecutive assistant entries at the end, so only
+    # the lines back to the preceding user message are read and parsed.
+    blocks = []
+    found_assistant = False
+
+    with open(transcript_path, "rb") as f:
+        for line in reversed_lines(f):
+            if not line.strip():
                 continue
             try:
-                entries.append(json.loads(line))
-            except json.JSONDecodeError:
+                entry = json.loads(line)
+            except ValueError:
                 continue
 
-    # Walk backwards to find the last assistant message with tool_use content
-    # We want all consecutive assistant entries at the end
-    blocks = []
-    found_assistant = False
-
-    for entry in reversed(entries):
-        msg = entry
-        if isinstance(entry, dict) and "message" in entry:
-            msg = entry["message"]
-        if not isinstance(msg, dict):
-            continue
+            if not isinstance(entry, dict):
+                continue
+            msg = entry.get("message", entry)
+            if not isinstance(msg, dict):
+                continue
 
-        role = msg.get("role", "")
-        typ = msg.get("type", "")
+            role = msg.get("role", "")
+            typ = msg.get("type", "")
 
-        is_assistant = role == "assistant" or typ in ("assistant", "assistant_message")
-        is_user = role == "user" or typ in ("user", "human")
-        is_result = role == "tool" or typ == "tool_result"
+            is_assistant = role == "assistant" or typ in ("assistant", "assistant_message")
+            is_user = role == "user" or typ in ("user", "human")
+            is_result = role == "tool" or typ == "tool_result"
 
-        if is_user and found_assistant:
-            break  # We've gone past the last assistant turn
+            if is_user and found_assistant:
+                break  # We've gone past the last assistant turn
 
-        if is_assistant or is_result:
-            found_assistant = True
-            content = msg.get("content", [])
-            if isinstance(content, list):
-                for item in content:
-                    if isinstance(item, dict) and item.get("type") in ("tool_use", "tool_result"):
-                        blocks.append(item)
+            if is_assistant or is_result:
+                found_assistant = True
+                content = msg.get("content", [])
+                if isinstance(content, list):
+                    for item in content:
+                        if isinstance(item, dict) and item.get("type") in ("tool_use", "tool_result"):
+                            blocks.append(item)
 
     return blocks
 
@@ -126,9 +123,17 @@ def build_summary(blocks: list[dict]) -> dict:
             if block.get("is_error"):
                 content = block.get("content", "")
                 if isinstance(content, list):
-                    content = " ".join(
-                        c.get("text", "") for c in content if isinstance(c, dict)
-                    )
+                    # Only the first 80 chars are kept, so stop joining
+                    # text parts (with their " " separators) once past that
+                    texts, size = [], -1
+                    for c in content:
+                        if isinstance(c, dict):
+                            text = c.get("text", "")
+                            texts.append(text)
+                            size += len(text) + 1
+                            if size > 80:
+                                break
+                    content = " ".join(texts)
                 if len(content) > 80:
                     content = content[:77] + "..."
                 errors.append(content)
@@ -144,7 +149,7 @@ def build_summary(blocks: list[dict]) -> dict:
 
 def format_summary(summary: dict) -> str:
     """Format the summary into the log output."""
-    ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     lines = [f"\u2550\u2550\u2550 TURN [{ts}] \u2550\u2550\u2550"]
 
     # Tools used
@@ -170,10 +175,7 @@ def format_summary(summary: dict) -> str:
         lines.append(f"Agents spawned: {', '.join(parts)}")
 
     # Errors
-    if summary["errors"]:
-        for err in summary["errors"]:
-            lines.append(f"Errors: {err}")
-
+    lines.extend([f"Errors: {err}" for err in summary["errors"]])
 
     # Cost data from recent cost-tracker.log entry
     cost_line = _get_recent_cost_entry(os.getenv("CLAUDE_PROJECT_DIR") or os.getcwd())
@@ -183,26 +185,30 @@ def format_summary(summary: dict) -> str:
     return "\n".join(lines)
 
 
+# A turn often Reads and then Edits the same files; functools is already
+# loaded by json, so the cache adds no import
+@functools.lru_cache(maxsize=1024)
 def _short_path(path: str) -> str:
     """Shorten a file path to last 2-3 components."""
-    parts = Path(path).parts
-    if len(parts) <= 3:
+    # Same result as PurePosixPath(path).parts, where a leading "/" counts as
+    # one part and empty and "." components are dropped, without importing
+    # pathlib
+    parts = [p for p in path.split("/") if p and p != "."]
+    if len(parts) + path.startswith("/") <= 3:
         return path
-    return str(Path(*parts[-3:]))
+    return "/".join(parts[-3:])
 
 
 def _get_recent_cost_entry(project_dir: str) -> str:
     """Get the most recent cost-tracker.log entry, if any."""
     try:
-        cost_log = Path(project_dir) / ".claude/logs/cost-tracker.log"
-        if not cost_log.exists():
-            return ""
-        # Read last line
-        with open(cost_log, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        if not lines:
-            return ""
-        last = lines[-1].strip()
+        cost_log = os.path.join(project_dir, ".claude", "logs", "cost-tracker.log")
+        # Read last line from the end; skip the empty piece after a
+        # trailing newline
+        with open(cost_log, "rb") as f:
+            tail = reversed_lines(f, 4096)
+            last = next(tail) or next(tail, b"")
+        last = last.decode("utf-8").strip()
         # Extract just the token counts and cost
         # Format: [timestamp] session=xxx in=N out=N cache=N cost=$N.NN
         parts = last.split("] ", 1)
@@ -220,7 +226,7 @@ def main() -> int:
     if not transcript_path:
         # Try reading from stdin payload
         try:
-            payload = json.load(sys.stdin)
+            payload = json.loads(sys.stdin.buffer.read())
             transcript_path = payload.get("transcript_path", "")
         except Exception:
             pass
@@ -251,10 +257,10 @@ def main() -> int:
     formatted = format_summary(summary)
 
     try:
-        log_path = Path(project_dir) / LOG_FILE
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(formatted + "\n\n")
+        # One O_APPEND write, so the multi-line entry can't interleave with
+        # other Stop hooks; openclaw_memory_sync reads it back as a block
+        ensure_logs_dir(project_dir)
+        append_log(os.path.join(project_dir, LOG_FILE), (formatted + "\n\n").encode("utf-8"))
     except Exception as e:
         _log_error(project_dir, f"Failed to write audit log: {e}")
 
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 """Quick functional test for guard_bash.py ALWAYS_ALLOWED + blocked patterns."""
-import subprocess, json, sys
+import subprocess, json, os, sys, time
 
-GUARD = "/opt/github/claude-code-autopilot/.claude/hooks/guard_bash.py"
+GUARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks", "guard_bash.py")
 
 tests = [
     # (command, should_be_blocked)
@@ -36,5 +36,27 @@ for cmd, should_block in tests:
         failed += 1
     print(f"  {status}: {'BLOCK' if blocked else 'ALLOW'} cmd={cmd!r}")
 
+# Cap-sized adversarial payloads: many rule leads across many lines, which a
+# backtracking rule rescans from every position. A hook past its 5s timeout
+# lets the command through, so each must finish well under that.
+MAX_COMMAND_CHARS = 128 * 1024
+TIME_LIMIT = 2.0
+units = ["curl>&\n", "curl > > > ", "curl |>& \n", "base64 -d base64 -d ", "echo echo | base64 -d |"]
+for unit in units:
+    for tail, should_block in (("true", False), ("rm -rf ~", True)):
+        cmd = "echo q; " + unit * ((MAX_COMMAND_CHARS - 20) // len(unit)) + tail
+        inp = json.dumps({"tool_input": {"command": cmd}})
+        start = time.monotonic()
+        r = subprocess.run(["python3", GUARD], input=inp, capture_output=True, text=True)
+        elapsed = time.monotonic() - start
+        blocked = r.returncode != 0
+        ok = blocked == should_block and elapsed < TIME_LIMIT
+        status = "PASS" if ok else "FAIL"
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"  {status}: {'BLOCK' if blocked else 'ALLOW'} in {elapsed:.2f}s cmd={unit!r}*N+{tail!r}")
+
 print(f"\nResults: {passed} passed, {failed} failed")
 sys.exit(1 if failed > 0 else 0)